@@ -0,0 +1,56 @@
+"""Сравнение скорости конвертации строк из базы с проверкой моделями и без нее.
+
+Запуск (из каталога etl):
+
+    python -m benchmarks.convert_rows --rows 200000
+"""
+import argparse
+import dataclasses
+import datetime
+import os
+import time
+import uuid
+
+# Настройки подключения к базе обязательны, но для замера не используются
+for env_name in ('POSTGRES_DB_NAME', 'POSTGRES_DB_USER', 'POSTGRES_DB_PASSWORD'):
+    os.environ.setdefault(env_name, 'benchmark')
+
+from common.models.utils_sql import MergeResult  # noqa: E402
+from common.utils import convert  # noqa: E402
+
+
+def make_rows(count: int) -> list:
+    """Строит строки результата запроса склейки кинопроизведений."""
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    persons = [{'id': str(uuid.uuid4()), 'name': f'Person {index}', 'role': 'actor'} for index in range(10)]
+    genres = [{'id': str(uuid.uuid4()), 'name': 'Drama'}]
+    return [
+        (
+            str(uuid.uuid4()), f'Film {index}', 'Description', 7.5, 'movie', now, now, persons, genres,
+        ) for index in range(count)
+    ]
+
+
+def measure(name: str, rows: list, column_names: list, validate: bool) -> float:
+    """Конвертирует строки и печатает число строк в секунду."""
+    convert.conf.validate_rows = validate
+    started_at = time.perf_counter()
+    converted = sum(1 for _ in convert.convert_sql2models(MergeResult, column_names, rows))
+    rows_per_second = converted / (time.perf_counter() - started_at)
+    print(f'{name:<12} {rows_per_second:>12,.0f} rows/sec')  # noqa: T001
+    return rows_per_second
+
+
+def main(args: argparse.Namespace):
+    """Сравнивает конвертацию с проверкой моделями и без нее."""
+    rows = make_rows(args.rows)
+    column_names = [field.name for field in dataclasses.fields(MergeResult)]
+    validated = measure('validated', rows, column_names, validate=True)
+    fast = measure('fast', rows, column_names, validate=False)
+    print(f'speedup      {fast / validated:>12.1f}x')  # noqa: T001
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000, help='Число строк')
+    main(parser.parse_args())
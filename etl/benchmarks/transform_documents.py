@@ -0,0 +1,78 @@
+"""Замер сборки документов фильмов в зависимости от числа участников.
+
+Сравнивает текущую сборку с отбрасыванием повторов по идентификатору
+и прежнюю проверку `not in` по растущим спискам. Время на одного участника
+у текущей сборки не растет с размером состава.
+
+Запуск (из каталога etl):
+
+    python -m benchmarks.transform_documents --films 50
+"""
+import argparse
+import datetime
+import os
+import time
+import uuid
+
+# Настройки подключения к базе обязательны, но для замера не используются
+for env_name in ('POSTGRES_DB_NAME', 'POSTGRES_DB_USER', 'POSTGRES_DB_PASSWORD'):
+    os.environ.setdefault(env_name, 'benchmark')
+
+from common.models.utils_sql import MergeResult  # noqa: E402
+from common.utils.convert import get_record_type  # noqa: E402
+from film_works.transform import PERSON_ROLES, Transform  # noqa: E402
+
+CAST_SIZES = (50, 100, 200, 500)
+
+
+def make_film(cast_size: int) -> tuple:
+    """Строит строку склейки по фильму с заданным числом участников."""
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    persons = [
+        {'id': str(uuid.uuid4()), 'name': f'Person {index}', 'role': PERSON_ROLES[index % len(PERSON_ROLES)]}
+        for index in range(cast_size)
+    ]
+    genres = [{'id': str(uuid.uuid4()), 'name': f'Genre {index}'} for index in range(5)]
+    record_type = get_record_type(MergeResult, tuple(MergeResult.__dataclass_fields__))
+    return record_type(str(uuid.uuid4()), 'Film', 'Description', 7.5, 'movie', now, now, persons, genres)
+
+
+def list_dedup_persons(doc: tuple) -> dict:
+    """Прежняя сборка участников с проверкой повторов по спискам."""
+    output_doc = {}
+    for role in PERSON_ROLES:
+        output_doc[f'{role}s'] = []
+        output_doc[f'{role}s_names'] = []
+    for person in doc.persons:
+        role_case_name = f"{person['role']}s"
+        if person['name'] not in output_doc[f'{role_case_name}_names']:
+            output_doc[f'{role_case_name}_names'].append(person['name'])
+        role_data = {'id': person['id'], 'name': person['name']}
+        if role_data not in output_doc[role_case_name]:
+            output_doc[role_case_name].append(role_data)
+    return output_doc
+
+
+def measure(name: str, func, films: list, cast_size: int):
+    """Собирает участников всех фильмов и печатает время на одного участника."""
+    started_at = time.perf_counter()
+    for film in films:
+        func(film)
+    elapsed = time.perf_counter() - started_at
+    per_person = elapsed / (len(films) * cast_size) * 1e9
+    print(f'{name:<8} cast={cast_size:<4} {per_person:>8.0f} ns/person')  # noqa: T001
+
+
+def main(args: argparse.Namespace):
+    """Сравнивает обе сборки на фильмах с разным числом участников."""
+    transform = Transform()
+    for cast_size in CAST_SIZES:
+        films = [make_film(cast_size) for _ in range(args.films)]
+        measure('sets', transform.get_persons_info, films, cast_size)
+        measure('lists', list_dedup_persons, films, cast_size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--films', type=int, default=50, help='Число фильмов каждого размера')
+    main(parser.parse_args())
@@ -1,16 +1,20 @@
 """Описание базового класса ETL-пайплайна по вычитыванию данных из postgres."""
 
-from datetime import datetime
-from typing import Iterator, Optional, List
+import uuid
+from itertools import islice
+from typing import Iterator, Optional, List, Tuple
 
 import psycopg2
 from psycopg2.extensions import connection as pg_connection
 from pydantic.dataclasses import dataclass
 
+from common.etl_settings import ETLSettings
 from common.logger import get_logger
+from common.state import Watermark
 from common.utils.convert import convert_sql2models
 
 logger = get_logger()
+conf = ETLSettings()
 
 
 class BaseExtractor:
@@ -24,6 +28,7 @@ class BaseExtractor:
         """
         self.connection = connection
         self.table_name = ''
+        self.itersize = conf.pg_cursor_itersize
 
     def execute(
             self,
@@ -47,6 +52,39 @@ class BaseExtractor:
                 err_description,
             )
 
+    def fetch_batches(
+            self,
+            sql: str,
+            batch_size: int,
+    ) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """Выполняет запрос на именованном серверном курсоре и отдает результат порциями.
+
+        Строки передаются из postgres по itersize за сетевой запрос, поэтому
+        память ETL не зависит от размера выборки, а первая порция доступна
+        сразу после получения первых строк.
+
+        Args:
+            sql: Строка запроса
+            batch_size: Размер порции данных
+
+        Yields:
+            Iterator[Tuple[List[str], List[tuple]]]: Названия колонок и порция строк
+        """
+        cursor_name = f'{self.__class__.__name__.lower()}_{uuid.uuid4().hex}'
+        with self.connection.cursor(name=cursor_name) as cursor:
+            cursor.itersize = self.itersize
+            self.execute(cursor, sql)
+
+            batch = list(islice(cursor, batch_size))
+            # У серверного курсора описание колонок появляется только после первой выборки
+            column_names = [
+                cursor_data[0]
+                for cursor_data in cursor.description or []
+            ]
+            while batch:
+                yield column_names, batch
+                batch = list(islice(cursor, batch_size))
+
     def set_values_sql_format(
             self,
             cursor: psycopg2.extensions.cursor,
@@ -82,35 +120,60 @@ class BaseProducer(BaseExtractor):
     def load_data(
             self,
             batch_size: int,
-            start_from: Optional[datetime],
-    ) -> Iterator[List[dataclass]]:
-        """Производит загрузку данных.
+            start_from: Optional[Watermark],
+    ) -> Iterator[Tuple[Watermark, List[dataclass]]]:
+        """Производит загрузку данных, измененных после позиции start_from.
+
+        Строки читаются постранично по ключу (updated_at, id): каждая порция -
+        отдельный запрос строк строго после последней строки предыдущей порции,
+        поэтому строки с одинаковым временем изменения не перечитываются.
+        Позиция берется по последней прочитанной строке до конвертации, чтобы
+        строки, не прошедшие проверку validate_rows, не останавливали выгрузку.
 
         Args:
             batch_size: Размер порции данных
-            start_from: Время последнего изменения данных
+            start_from: Позиция последней выгруженной строки
 
         Yields:
-             Iterator[list[FilmWork]]:
-             Итератор с порцией данных в формате dataclass
+             Iterator[Tuple[Watermark, List[dataclass]]]:
+             Позиция последней строки порции и строки порции в формате dataclass
+        """
+        while True:
+            column_names, rows = self.load_batch(batch_size, start_from)
+            if not rows:
+                return
+            last_row = dict(zip(column_names, rows[-1]))
+            start_from = Watermark(last_row['updated_at'].isoformat(), last_row['id'])
+            yield start_from, list(convert_sql2models(self.dataclass, column_names, rows))
+            if len(rows) < batch_size:
+                return
+
+    def load_batch(
+            self,
+            batch_size: int,
+            start_from: Optional[Watermark],
+    ) -> Tuple[List[str], List[tuple]]:
+        """Загружает одну порцию строк после позиции start_from.
+
+        Args:
+            batch_size: Размер порции данных
+            start_from: Позиция последней выгруженной строки
+
+        Returns:
+             Tuple[List[str], List[tuple]]: Названия колонок и строки порции
         """
         with self.connection.cursor() as cursor:
-            updated_at_from_field = ''
+            where = ''
+            params = []
             if start_from:
-                updated_at_from_field = f"WHERE updated_at >= '{start_from}'"
-            sql = cursor.mogrify(f"""SELECT * FROM {self.table_name}
-            {updated_at_from_field} ORDER BY updated_at;""")
-            self.execute(cursor, sql)
+                where = 'WHERE (updated_at, id) > (%s, %s)'
+                params = [start_from.updated_at, start_from.id]
+            sql = cursor.mogrify(
+                f'SELECT * FROM {self.table_name} {where} ORDER BY updated_at, id LIMIT %s;',
+                [*params, batch_size],
+            )
 
-            column_names = [
-                cursor_data[0]
-                for cursor_data in cursor.description
-            ]
-            batch = cursor.fetchmany(batch_size)
-            while batch:
-                yield convert_sql2models(
-                    self.dataclass,
-                    column_names,
-                    batch,
-                )
-                batch = cursor.fetchmany(batch_size)
+        column_names, rows = [], []
+        for column_names, batch in self.fetch_batches(sql, batch_size):
+            rows.extend(batch)
+        return column_names, rows
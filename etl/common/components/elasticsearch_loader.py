@@ -1,11 +1,12 @@
 """Описание класса ETL-пайплайна по сохранению данных в elasticsearch.."""
 import json
-from typing import Iterator, List
+from typing import Iterator, List, Optional
 
 import elastic_transport
 import elasticsearch
 from elasticsearch.helpers import bulk
 
+from common.components.publisher import ChangesPublisher
 from common.logger import get_logger
 from common.postgres_utils import backoff
 
@@ -16,30 +17,67 @@ class ElasticsearchLoader:
     """Класс, реализующий запись данных в elasticsearch."""
 
     @backoff(elastic_transport.ConnectionError)
-    def __init__(self, es: elasticsearch, index_name: str, json_path: str):
+    def __init__(
+            self,
+            es: elasticsearch,
+            index_name: str,
+            json_path: str,
+            index_version: int,
+            publisher: Optional[ChangesPublisher] = None,
+    ):
         """Инициализирует переменные класса.
 
+        Документы пишутся в индекс текущей версии описания, а API читает их
+        через псевдоним index_name. Пока псевдоним указывает на прежний индекс,
+        новая версия заполняется с нуля и подключается методом switch_alias.
+
         Args:
             es: Объект elasticsearch
-            index_name: Название индекса elasticsearch
+            index_name: Название псевдонима индекса elasticsearch
+            json_path: Путь к json-описанию индекса
+            index_version: Версия описания индекса
+            publisher: Оповещатель об изменении документов
         """
         self.es = es
         self.index_name = index_name
+        self.versioned_index_name = f'{index_name}_v{index_version}'
         self.index_json_path = json_path
-        if not self.es.indices.exists(index=self.index_name):
-            self.create_index()
+        self.publisher = publisher
+        self.create_index()
+        self.alias_switched = bool(
+            self.es.indices.exists_alias(name=self.index_name, index=self.versioned_index_name),
+        )
 
     @backoff(elastic_transport.ConnectionError)
     def create_index(self):
-        """Создает индекс в случае его отсутствия."""
+        """Создает индекс текущей версии в случае его отсутствия."""
+        if self.es.indices.exists(index=self.versioned_index_name):
+            return
         with open(self.index_json_path, 'r') as index_file:
             index_dict = json.load(index_file)
 
-            self.es.indices.create(
-                index=self.index_name,
-                ignore=400,
-                **index_dict,
+        self.es.indices.create(index=self.versioned_index_name, **index_dict)
+        logger.warning('Created index %s', self.versioned_index_name)
+
+    @backoff(elastic_transport.ConnectionError)
+    def switch_alias(self):
+        """Переключает псевдоним на индекс текущей версии и удаляет прежние индексы."""
+        if self.alias_switched:
+            return
+        actions = [{'add': {'index': self.versioned_index_name, 'alias': self.index_name}}]
+        if self.es.indices.exists_alias(name=self.index_name):
+            old_indices = self.es.indices.get_alias(name=self.index_name)
+            actions.extend(
+                {'remove_index': {'index': old_index}}
+                for old_index in old_indices if old_index != self.versioned_index_name
             )
+        elif self.es.indices.exists(index=self.index_name):
+            # Индекс без версии занимает имя псевдонима
+            actions.append({'remove_index': {'index': self.index_name}})
+
+        self.es.indices.update_aliases(actions=actions)
+        self.alias_switched = True
+        logger.warning('Alias %s switched to index %s', self.index_name, self.versioned_index_name)
 
     @backoff(elastic_transport.ConnectionError)
     def write_to_index(self, docs: List[dict]):
@@ -48,10 +86,15 @@ class ElasticsearchLoader:
         Args:
             docs: Подготовленные документы для записи в elasticsearch
         """
-        bulk(self.es, self.generate_data(docs))
+        # Оповещение уходит после того, как документы видны поиску, иначе API
+        # перестроит кэш списков по данным до записи
+        bulk(self.es, self.generate_data(docs), refresh='wait_for')
         docs_size = len(docs)
         logger.warning(f'Write {docs_size} docs into elastic.')
 
+        if self.publisher:
+            self.publisher.publish(self.index_name, docs)
+
     def generate_data(self, docs: List[dict]) -> Iterator[dict]:
         """Генерирует документы для bulk запроса.
 
@@ -65,6 +108,6 @@ class ElasticsearchLoader:
             yield {
                 '_op_type': 'index',
                 '_id': doc['id'],
-                '_index': self.index_name,
+                '_index': self.versioned_index_name,
                 '_source': doc,
             }
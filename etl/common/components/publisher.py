@@ -0,0 +1,44 @@
+"""Описание класса ETL-пайплайна по оповещению об изменении документов."""
+import json
+from typing import Iterable
+
+import redis
+
+from common.logger import get_logger
+
+logger = get_logger()
+
+
+class ChangesPublisher:
+    """Класс, публикующий идентификаторы измененных документов в канал Redis.
+
+    API подписано на канал и по сообщениям сбрасывает закэшированные
+    данные измененных сущностей, не дожидаясь истечения их TTL.
+    """
+
+    def __init__(self, redis_client: redis.Redis, channel: str):
+        """Инициализирует переменные класса.
+
+        Args:
+            redis_client: Клиент Redis
+            channel: Название канала для публикации изменений
+        """
+        self.redis = redis_client
+        self.channel = channel
+
+    def publish(self, index_name: str, docs: Iterable[dict]):
+        """Публикует идентификаторы записанных документов.
+
+        Args:
+            index_name: Название индекса elasticsearch
+            docs: Записанные в индекс документы
+        """
+        message = json.dumps({
+            'index': index_name,
+            'ids': [doc['id'] for doc in docs],
+        })
+        try:
+            self.redis.publish(self.channel, message)
+        except redis.RedisError as err:
+            # Без оповещения данные в кэше API устареют только до истечения TTL
+            logger.error('Failed to publish changes of index %s: %s', index_name, err)
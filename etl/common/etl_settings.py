@@ -13,8 +13,18 @@ class ETLSettings(BaseSettings):
     postgres_db_port: int = 5432
 
     data_batch_size: int = 50
+    # Сколько строк серверный курсор postgres передает за один сетевой запрос
+    pg_cursor_itersize: int = 1000
+    # Проверять строки из базы моделями pydantic (медленно, для отладки)
+    validate_rows: bool = False
 
     elastic_url: str = 'http://localhost:9200/'
+    # Версия описания индекса: при ее изменении индекс создается заново и заполняется с нуля
+    elastic_index_version: int = 1
+
+    redis_host: str = 'redis'
+    redis_port: int = 6379
+    cache_invalidation_channel: str = 'cache_invalidation'
     path_to_storage_json: str = 'storage.json'
 
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -1,9 +1,9 @@
 import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic.dataclasses import dataclass
 
-from common.models.main import FilmWorkId, PersonId, GenreId
+from common.models.main import FilmWorkId, PersonId
 
 
 @dataclass(frozen=True)
@@ -14,6 +14,17 @@ class EnrichResult:
     updated_at: datetime.datetime
 
 
+@dataclass(frozen=True)
+class FilmographyResult:
+    """Модель результата выполнения запроса по фильмографии персон."""
+
+    person_id: PersonId
+    pfw_role: str
+    film_work_id: FilmWorkId
+    film_work_title: str
+    film_work_rating: Optional[float]
+
+
 @dataclass(frozen=True)
 class MergeResult:
     """Модель результата выполнения запроса по склейке данных."""
@@ -25,8 +36,7 @@ class MergeResult:
     film_work_type: str
     film_work_created_at: datetime.datetime
     film_work_updated_at: datetime.datetime
-    pfw_role: Optional[str]
-    person_id: Optional[PersonId]
-    person_full_name: Optional[str]
-    genre_name: str
-    genre_id: GenreId
+    # Участники фильма в виде {'id', 'name', 'role'}
+    persons: List[dict]
+    # Жанры фильма в виде {'id', 'name'}
+    genres: List[dict]
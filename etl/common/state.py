@@ -1,7 +1,17 @@
 import abc
 import json
 import os
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
+
+# Идентификатор меньше любого другого, используется для старых состояний без id
+MIN_ID = '00000000-0000-0000-0000-000000000000'
+
+
+class Watermark(NamedTuple):
+    """Позиция последней выгруженной строки в порядке (updated_at, id)."""
+
+    updated_at: str
+    id: str
 
 
 class BaseStorage:
@@ -97,3 +107,32 @@ class State:
             Any: Данные хранилища по ключу
         """
         return self.states.get(key)
+
+    def set_watermark(self, key: str, updated_at: str, row_id: str):
+        """Сохранить позицию последней выгруженной строки.
+
+        Args:
+            key: Ключ для сохранения
+            updated_at: Время изменения строки в формате iso
+            row_id: Идентификатор строки
+        """
+        self.set_state(key, {'updated_at': updated_at, 'id': row_id})
+
+    def get_watermark(self, key: str) -> Optional[Watermark]:
+        """Получить позицию последней выгруженной строки.
+
+        Раньше в состоянии хранилось только время изменения, такие строки
+        с этим временем перечитываются один раз.
+
+        Args:
+            key: Ключ
+
+        Returns:
+            Optional[Watermark]: Позиция строки, None - если выгрузки еще не было
+        """
+        value = self.get_state(key)
+        if not value:
+            return None
+        if isinstance(value, str):
+            return Watermark(value, MIN_ID)
+        return Watermark(value['updated_at'], value['id'])
@@ -1,12 +1,30 @@
 """Модуль конвертации данных."""
-from typing import Iterator, List
+from collections import namedtuple
+from functools import lru_cache
+from typing import Iterator, List, Tuple
 
 import pydantic
 from pydantic.dataclasses import dataclass
 
+from common.etl_settings import ETLSettings
 from common.logger import get_logger
 
 logger = get_logger()
+conf = ETLSettings()
+
+
+@lru_cache()
+def get_record_type(class_type: dataclass, column_names: Tuple[str, ...]) -> type:
+    """Возвращает тип записи с полями по колонкам результата запроса.
+
+    Args:
+        class_type: Dataclass, соответствующей таблице с данными
+        column_names: Названия колонок базы
+
+    Returns:
+        type: namedtuple с именем dataclass и полями по колонкам
+    """
+    return namedtuple(class_type.__name__, column_names)
 
 
 def convert_sql2models(
@@ -16,6 +34,10 @@ def convert_sql2models(
 ) -> Iterator[dataclass]:
     """Конвертирует сырые данные из базы в модели dataclass.
 
+    По умолчанию строки без проверки типов превращаются в namedtuple с теми же
+    полями, что и у dataclass. Проверка через dataclass включается настройкой
+    validate_rows для отладки.
+
     Args:
         class_type: Dataclass, соответствующей таблице с данными
         column_names: Названия колонок базы
@@ -24,6 +46,10 @@ def convert_sql2models(
     Yields:
          Iterator[dataclass]: итератор модели dataclass
     """
+    if not conf.validate_rows:
+        yield from map(get_record_type(class_type, tuple(column_names))._make, db_rows)
+        return
+
     for row in db_rows:
         model_dict = {
             col_name: row_val
@@ -52,28 +52,19 @@ class Enricher(BaseExtractor):
                 producer_ids,
             )
 
-            sql = cursor.mogrify(
-                f'SELECT enrch.id, enrch.updated_at '
-                f'FROM content.{self.enrich_table_name} as enrch '
-                f'LEFT JOIN content.{self.table_name} as m2m '
-                f'ON m2m.{self.enrich_table_name}_id = enrch.id '
-                f'WHERE m2m.{self.producer_table_name}_id '
-                f'IN {sql_values_format} '
-                f'ORDER BY enrch.updated_at',
-                f'LIMIT {batch_size};',
-            )
-
-            self.execute(cursor, sql)
+        sql = (
+            f'SELECT enrch.id, enrch.updated_at '
+            f'FROM content.{self.enrich_table_name} as enrch '
+            f'LEFT JOIN content.{self.table_name} as m2m '
+            f'ON m2m.{self.enrich_table_name}_id = enrch.id '
+            f'WHERE m2m.{self.producer_table_name}_id '
+            f'IN {sql_values_format} '
+            f'ORDER BY enrch.updated_at;'
+        )
 
-            column_names = [
-                cursor_data[0]
-                for cursor_data in cursor.description
-            ]
-            batch = cursor.fetchmany(batch_size)
-            while batch:
-                yield convert_sql2models(
-                    self.dataclass,
-                    column_names,
-                    batch,
-                )
-                batch = cursor.fetchmany(batch_size)
+        for column_names, batch in self.fetch_batches(sql, batch_size):
+            yield convert_sql2models(
+                self.dataclass,
+                column_names,
+                batch,
+            )
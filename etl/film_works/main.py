@@ -1,7 +1,9 @@
+import redis
 from elasticsearch import Elasticsearch
 from psycopg2.extensions import connection as pg_connection
 
 from common.components.elasticsearch_loader import ElasticsearchLoader
+from common.components.publisher import ChangesPublisher
 from common.components.producer import (
     PersonProducer,
     FilmWorkProducer,
@@ -15,7 +17,7 @@ from film_works.transform import Transform
 
 
 def run_film_works_etl(
-        es: Elasticsearch,
+        elastic_saver: ElasticsearchLoader,
         pg_conn: pg_connection,
         batch_size: int,
         state: State,
@@ -23,7 +25,7 @@ def run_film_works_etl(
     """Запускает ETL-процесс для кинопроизведений.
 
     Args:
-        es: Объект elasticsearch
+        elastic_saver: Загрузчик документов в elasticsearch
         pg_conn: Соединение к postgres
         batch_size: Размер батча
         state: Хранилище состояния
@@ -31,29 +33,24 @@ def run_film_works_etl(
     producer = FilmWorkProducer(pg_conn)
     merger = Merger(pg_conn)
     transform = Transform()
-    elastic_saver = ElasticsearchLoader(es, conf.elastic_index_name, conf.index_json_path)
 
-    latest_person_state = state.get_state(conf.table_name)
+    latest_person_state = state.get_watermark(conf.table_name)
 
     fw_producer_loader = producer.load_data(batch_size, latest_person_state)
-    for fw_batch in fw_producer_loader:
-        fws_list = list(fw_batch)
-        fw_ids = [fw.id for fw in fws_list]
-
-        merge_data_loader = merger.load_data(fw_ids, batch_size)
-        transform.create_documents(merge_data_loader)
-        elastic_saver.write_to_index(
-            transform.base_dict.values(),
-        )
+    for watermark, fws_list in fw_producer_loader:
+        if fws_list:
+            fw_ids = [fw.id for fw in fws_list]
+            merge_data_loader = merger.load_data(fw_ids, batch_size)
+            transform.create_documents(merge_data_loader)
+            elastic_saver.write_to_index(
+                transform.base_dict.values(),
+            )
 
-        state.set_state(
-            conf.table_name,
-            fws_list[-1].updated_at.isoformat(),
-        )
+        state.set_watermark(conf.table_name, watermark.updated_at, watermark.id)
 
 
 def run_universal_etl(
-        es: Elasticsearch,
+        elastic_saver: ElasticsearchLoader,
         pg_conn: pg_connection,
         batch_size: int,
         state: State,
@@ -63,7 +60,7 @@ def run_universal_etl(
     """Запускает ETL-процесс для участников фильма.
 
     Args:
-        es: Объект elasticsearch
+        elastic_saver: Загрузчик документов в elasticsearch
         pg_conn: Соединение к postgres
         batch_size: Размер батча
         state: Хранилище состояния
@@ -79,21 +76,21 @@ def run_universal_etl(
     )
     merger = Merger(pg_conn)
     transform = Transform()
-    elastic_saver = ElasticsearchLoader(es, conf.elastic_index_name, conf.index_json_path)
 
-    latest_producer_state = state.get_state(producer_table_name)
+    latest_producer_state = state.get_watermark(producer_table_name)
 
     producers_loader = producer.load_data(
         batch_size,
         latest_producer_state,
     )
-    for producers_batch in producers_loader:
-        producers_list = list(producers_batch)
+    for watermark, producers_list in producers_loader:
         producers_ids = [producer.id for producer in producers_list]
 
-        fw_generator = enricher.load_data(producers_ids, batch_size)
+        fw_generator = enricher.load_data(producers_ids, batch_size) if producers_ids else []
         for fw_batch in fw_generator:
             fws_list = list(fw_batch)
+            if not fws_list:
+                continue
             fw_ids = [fw.id for fw in fws_list]
             persons_merger_loader = merger.load_data(fw_ids, batch_size)
 
@@ -101,10 +98,7 @@ def run_universal_etl(
             elastic_saver.write_to_index(
                 transform.base_dict.values(),
             )
-        state.set_state(
-            producer_table_name,
-            producers_list[-1].updated_at.isoformat(),
-        )
+        state.set_watermark(producer_table_name, watermark.updated_at, watermark.id)
 
 
 def main():
@@ -122,10 +116,21 @@ def main():
     state = State(storage)
     portion_size = conf.data_batch_size
     es = Elasticsearch(conf.elastic_url)
+    publisher = ChangesPublisher(
+        redis.Redis(host=conf.redis_host, port=conf.redis_port),
+        conf.cache_invalidation_channel,
+    )
+    elastic_saver = ElasticsearchLoader(
+        es, conf.elastic_index_name, conf.index_json_path, conf.elastic_index_version, publisher,
+    )
+    if not elastic_saver.alias_switched:
+        # Новая версия индекса заполняется с начала выгрузки
+        for state_key in (conf.table_name, 'genre', 'person'):
+            state.set_state(state_key, None)
     with pg_conn:
         while True:
             run_universal_etl(
-                es,
+                elastic_saver,
                 pg_conn,
                 portion_size,
                 state,
@@ -133,14 +138,15 @@ def main():
                 'genre_film_work',
             )
             run_universal_etl(
-                es,
+                elastic_saver,
                 pg_conn,
                 portion_size,
                 state,
                 'person',
                 'person_film_work',
             )
-            run_film_works_etl(es, pg_conn, portion_size, state)
+            run_film_works_etl(elastic_saver, pg_conn, portion_size, state)
+            elastic_saver.switch_alias()
     pg_conn.close()
 
 
@@ -40,6 +40,8 @@ class Merger(BaseExtractor):
                 dataclasses.fields(self.dataclass)
             ]
 
+            # Участники и жанры собираются отдельными подзапросами в json-массивы,
+            # чтобы на каждый фильм приходилась ровно одна строка
             select_fields = [
                 'fw.id',
                 'fw.title',
@@ -48,11 +50,18 @@ class Merger(BaseExtractor):
                 'fw.type',
                 'fw.created_at',
                 'fw.updated_at',
-                'pfw.role',
-                'p.id',
-                'p.full_name',
-                'g.name',
-                'g.id',
+                """COALESCE((
+                    SELECT json_agg(json_build_object('id', p.id, 'name', p.full_name, 'role', pfw.role))
+                    FROM content.person_film_work pfw
+                    JOIN content.person p ON p.id = pfw.person_id
+                    WHERE pfw.film_work_id = fw.id
+                ), '[]'::json)""",
+                """COALESCE((
+                    SELECT json_agg(json_build_object('id', g.id, 'name', g.name))
+                    FROM content.genre_film_work gfw
+                    JOIN content.genre g ON g.id = gfw.genre_id
+                    WHERE gfw.film_work_id = fw.id
+                ), '[]'::json)""",
             ]
 
             select_sql_str = ', '.join([f'{select_field} as {model_field_name}'
@@ -62,19 +71,12 @@ class Merger(BaseExtractor):
 
             sql = f"""SELECT {select_sql_str}
             FROM content.film_work fw
-            LEFT JOIN content.person_film_work pfw ON pfw.film_work_id = fw.id
-            LEFT JOIN content.person p ON p.id = pfw.person_id
-            LEFT JOIN content.genre_film_work gfw ON gfw.film_work_id = fw.id
-            LEFT JOIN content.genre g ON g.id = gfw.genre_id
             WHERE fw.id IN {sql_values_format};
             """
 
-            self.execute(cursor, sql)
-            batch = cursor.fetchmany(batch_size)
-            while batch:
-                yield convert_sql2models(
-                    self.dataclass,
-                    column_names,
-                    batch,
-                )
-                batch = cursor.fetchmany(batch_size)
+        for _, batch in self.fetch_batches(sql, batch_size):
+            yield convert_sql2models(
+                self.dataclass,
+                column_names,
+                batch,
+            )
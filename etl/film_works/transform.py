@@ -2,6 +2,8 @@ from typing import Iterator
 
 from common.models.utils_sql import MergeResult
 
+PERSON_ROLES = ('actor', 'writer', 'director')
+
 
 class Transform:
     """Класс, трансформирующий данные после бд для попадания в elastic."""
@@ -16,6 +18,11 @@ class Transform:
     ):
         """Строит набор документов для записи в elastic.
 
+        Склейка возвращает ровно одну строку на фильм с уже собранными
+        участниками и жанрами, поэтому документ строится из строки целиком.
+        Повторы участников и жанров отбрасываются по идентификатору за
+        линейное время, порядок первого появления сохраняется.
+
         Args:
             merge_data_generator: Данные для построения документа
         """
@@ -23,90 +30,52 @@ class Transform:
 
         for merge_batch in merge_data_generator:
             for doc in merge_batch:
-                if doc.film_work_id not in self.base_dict:
-                    es_doc = {
-                        'id': doc.film_work_id,
-                        'imdb_rating': doc.film_work_rating,
-                        'title': doc.film_work_title,
-                        'description': doc.film_work_description,
-                        'genres': [],
-                        'genres_names': [],
-                        'directors': [],
-                        'directors_names': [],
-                        'actors': [],
-                        'actors_names': [],
-                        'writers': [],
-                        'writers_names': [],
-                    }
-                else:
-                    es_doc = self.base_dict[doc.film_work_id]
-                    es_doc |= {
-                        'id': doc.film_work_id,
-                        'imdb_rating': doc.film_work_rating,
-                        'title': doc.film_work_title,
-                        'description': doc.film_work_description,
-                    }
-
-                es_person_enrich_doc = self.add_addition_person_info(doc, es_doc)
-                es_ready_doc = self.add_addition_genres_info(doc, es_person_enrich_doc)
-
-                self.base_dict[doc.film_work_id] = es_ready_doc
-
-    def add_addition_person_info(
-            self,
-            doc: MergeResult,
-            output_doc: dict,
-    ) -> dict:
-        """Обогащает документы эластика дополнительными данными по персонам.
+                es_doc = {
+                    'id': doc.film_work_id,
+                    'imdb_rating': doc.film_work_rating,
+                    'title': doc.film_work_title,
+                    'description': doc.film_work_description,
+                }
+                es_doc |= self.get_persons_info(doc)
+                es_doc |= self.get_genres_info(doc)
+
+                self.base_dict[doc.film_work_id] = es_doc
+
+    def get_persons_info(self, doc: MergeResult) -> dict:
+        """Строит поля документа эластика по участникам фильма.
 
         Args:
-            doc: Обогащающие документы
-            output_doc: Результирующие документы
+            doc: Строка склейки по фильму
 
         Returns:
-            dict: Обогащенный словарь для elastic
+            dict: Участники и их имена по ролям
         """
-        if doc.pfw_role:
-            role_case_name = f'{doc.pfw_role}s'
-            names_case_name = f'{role_case_name}_names'
-
-            if doc.person_full_name not in output_doc[names_case_name]:
-                output_doc[names_case_name].append(
-                    doc.person_full_name,
-                )
-
-            role_data = {
-                'id': doc.person_id,
-                'name': doc.person_full_name,
-            }
-            if role_data not in output_doc[role_case_name]:
-                output_doc[role_case_name].append(role_data)
+        persons_by_role = {role: {} for role in PERSON_ROLES}
+        for person in doc.persons:
+            persons_by_role[person['role']].setdefault(person['id'], {
+                'id': person['id'],
+                'name': person['name'],
+            })
+
+        output_doc = {}
+        for role, persons in persons_by_role.items():
+            output_doc[f'{role}s'] = list(persons.values())
+            output_doc[f'{role}s_names'] = list(dict.fromkeys(person['name'] for person in persons.values()))
         return output_doc
 
-    def add_addition_genres_info(
-            self,
-            doc: MergeResult,
-            output_doc: dict,
-    ) -> dict:
-        """Обогащает документы эластика дополнительными данными по жанрам.
+    def get_genres_info(self, doc: MergeResult) -> dict:
+        """Строит поля документа эластика по жанрам фильма.
 
         Args:
-            doc: Обогащающие документы
-            output_doc: Результирующие документы
+            doc: Строка склейки по фильму
 
         Returns:
-            dict: Обогащенный словарь для elastic
+            dict: Жанры фильма и их названия
         """
-        genre_data = {
-            'id': doc.genre_id,
-            'name': doc.genre_name,
+        genres = {}
+        for genre in doc.genres:
+            genres.setdefault(genre['id'], {'id': genre['id'], 'name': genre['name']})
+        return {
+            'genres': list(genres.values()),
+            'genres_names': list(dict.fromkeys(genre['name'] for genre in genres.values())),
         }
-        if genre_data not in output_doc['genres']:
-            output_doc['genres'].append(genre_data)
-
-        if doc.genre_name not in output_doc['genres_names']:
-            output_doc['genres_names'].append(
-                doc.genre_name,
-            )
-
-        return output_doc
@@ -1,7 +1,9 @@
+import redis
 from elasticsearch import Elasticsearch
 from psycopg2.extensions import connection as pg_connection
 
 from common.components.elasticsearch_loader import ElasticsearchLoader
+from common.components.publisher import ChangesPublisher
 from common.components.producer import GenreProducer
 from common.postgres_utils import create_pg_connection
 from common.state import State, JsonFileStorage
@@ -10,7 +12,7 @@ from genres.transform import Transform
 
 
 def run_genres_etl(
-        es: Elasticsearch,
+        elastic_saver: ElasticsearchLoader,
         pg_conn: pg_connection,
         batch_size: int,
         state: State,
@@ -18,30 +20,25 @@ def run_genres_etl(
     """Запускает ETL-процесс для кинопроизведений.
 
     Args:
-        es: Объект elasticsearch
+        elastic_saver: Загрузчик документов в elasticsearch
         pg_conn: Соединение к postgres
         batch_size: Размер батча
         state: Хранилище состояния
     """
     producer = GenreProducer(pg_conn)
     transform = Transform()
-    elastic_saver = ElasticsearchLoader(es, conf.elastic_index_name, conf.index_json_path)
 
-    latest_genres_state = state.get_state(conf.table_name)
+    latest_genres_state = state.get_watermark(conf.table_name)
 
     genres_producer = producer.load_data(batch_size, latest_genres_state)
-    for producers_batch in genres_producer:
-        genres_list = list(producers_batch)
+    for watermark, genres_list in genres_producer:
+        if genres_list:
+            transform.create_documents(genres_list)
+            elastic_saver.write_to_index(
+                transform.base_dict.values(),
+            )
 
-        transform.create_documents(genres_list)
-        elastic_saver.write_to_index(
-            transform.base_dict.values(),
-        )
-
-        state.set_state(
-            conf.table_name,
-            genres_list[-1].updated_at.isoformat(),
-        )
+        state.set_watermark(conf.table_name, watermark.updated_at, watermark.id)
 
 
 def main():
@@ -59,9 +56,21 @@ def main():
     state = State(storage)
     portion_size = conf.data_batch_size
     es = Elasticsearch(conf.elastic_url)
+    publisher = ChangesPublisher(
+        redis.Redis(host=conf.redis_host, port=conf.redis_port),
+        conf.cache_invalidation_channel,
+    )
+    elastic_saver = ElasticsearchLoader(
+        es, conf.elastic_index_name, conf.index_json_path, conf.elastic_index_version, publisher,
+    )
+    if not elastic_saver.alias_switched:
+        # Новая версия индекса заполняется с начала выгрузки
+        for state_key in (conf.table_name,):
+            state.set_state(state_key, None)
     with pg_conn:
         while True:
-            run_genres_etl(es, pg_conn, portion_size, state)
+            run_genres_etl(elastic_saver, pg_conn, portion_size, state)
+            elastic_saver.switch_alias()
     pg_conn.close()
 
 
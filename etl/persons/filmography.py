@@ -0,0 +1,65 @@
+from typing import Iterator, List
+
+from common.components.base import BaseExtractor
+from common.models.main import Person
+from common.models.utils_sql import FilmographyResult
+from common.utils.convert import convert_sql2models
+
+
+class Filmography(BaseExtractor):
+    """Класс, собирающий фильмографию персон для etl-пайплайна."""
+
+    def load_data(
+            self,
+            person_ids: List[str],
+            batch_size: int,
+    ) -> Iterator[Iterator[FilmographyResult]]:
+        """Загружает кинопроизведения персон с ролями в них.
+
+        Args:
+            person_ids: Идентификаторы персон
+            batch_size: Размер результирующего батча
+
+        Yields:
+            Iterator[Iterator[FilmographyResult]]: батч с фильмографией персон
+        """
+        with self.connection.cursor() as cursor:
+            sql_values_format = self.set_values_sql_format(cursor, person_ids)
+            sql = f"""SELECT pfw.person_id, pfw.role as pfw_role,
+            fw.id as film_work_id, fw.title as film_work_title, fw.rating as film_work_rating
+            FROM content.person_film_work pfw
+            JOIN content.film_work fw ON fw.id = pfw.film_work_id
+            WHERE pfw.person_id IN {sql_values_format}
+            ORDER BY pfw.person_id, fw.id;
+            """
+
+        for column_names, batch in self.fetch_batches(sql, batch_size):
+            yield convert_sql2models(
+                FilmographyResult,
+                column_names,
+                batch,
+            )
+
+    def load_persons(self, fw_ids: List[str]) -> List[Person]:
+        """Загружает персон, участвовавших в кинопроизведениях.
+
+        Args:
+            fw_ids: Идентификаторы кинопроизведений
+
+        Returns:
+            List[Person]: Персоны кинопроизведений
+        """
+        with self.connection.cursor() as cursor:
+            sql_values_format = self.set_values_sql_format(cursor, fw_ids)
+            sql = f"""SELECT DISTINCT p.id, p.full_name, p.created_at, p.updated_at
+            FROM content.person p
+            JOIN content.person_film_work pfw ON pfw.person_id = p.id
+            WHERE pfw.film_work_id IN {sql_values_format};
+            """
+            self.execute(cursor, sql)
+
+            column_names = [
+                cursor_data[0]
+                for cursor_data in cursor.description
+            ]
+            return list(convert_sql2models(Person, column_names, cursor.fetchall()))
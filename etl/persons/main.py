@@ -1,47 +1,80 @@
+import redis
 from elasticsearch import Elasticsearch
 from psycopg2.extensions import connection as pg_connection
 
 from common.components.elasticsearch_loader import ElasticsearchLoader
-from common.components.producer import PersonProducer
+from common.components.publisher import ChangesPublisher
+from common.components.producer import FilmWorkProducer, PersonProducer
 from common.postgres_utils import create_pg_connection
 from common.state import State, JsonFileStorage
+from persons.filmography import Filmography
 from persons.settings import conf
 from persons.transform import Transform
 
 
 def run_persons_etl(
-        es: Elasticsearch,
+        elastic_saver: ElasticsearchLoader,
         pg_conn: pg_connection,
         batch_size: int,
         state: State,
 ):
-    """Запускает ETL-процесс для кинопроизведений.
+    """Запускает ETL-процесс для участников фильма.
 
     Args:
-        es: Объект elasticsearch
+        elastic_saver: Загрузчик документов в elasticsearch
         pg_conn: Соединение к postgres
         batch_size: Размер батча
         state: Хранилище состояния
     """
     producer = PersonProducer(pg_conn)
+    filmography = Filmography(pg_conn)
     transform = Transform()
-    elastic_saver = ElasticsearchLoader(es, conf.elastic_index_name, conf.index_json_path)
 
-    latest_genres_state = state.get_state(conf.table_name)
+    latest_persons_state = state.get_watermark(conf.table_name)
 
-    genres_producer = producer.load_data(batch_size, latest_genres_state)
-    for producers_batch in genres_producer:
-        genres_list = list(producers_batch)
+    persons_producer = producer.load_data(batch_size, latest_persons_state)
+    for watermark, persons_list in persons_producer:
+        if persons_list:
+            person_ids = [person.id for person in persons_list]
+            transform.create_documents(persons_list, filmography.load_data(person_ids, batch_size))
+            elastic_saver.write_to_index(
+                transform.base_dict.values(),
+            )
 
-        transform.create_documents(genres_list)
-        elastic_saver.write_to_index(
-            transform.base_dict.values(),
-        )
+        state.set_watermark(conf.table_name, watermark.updated_at, watermark.id)
 
-        state.set_state(
-            conf.table_name,
-            genres_list[-1].updated_at.isoformat(),
-        )
+
+def run_filmography_etl(
+        elastic_saver: ElasticsearchLoader,
+        pg_conn: pg_connection,
+        batch_size: int,
+        state: State,
+):
+    """Запускает ETL-процесс обновления фильмографии персон по измененным кинопроизведениям.
+
+    Args:
+        elastic_saver: Загрузчик документов в elasticsearch
+        pg_conn: Соединение к postgres
+        batch_size: Размер батча
+        state: Хранилище состояния
+    """
+    producer = FilmWorkProducer(pg_conn)
+    filmography = Filmography(pg_conn)
+    transform = Transform()
+
+    latest_fw_state = state.get_watermark(conf.film_works_state_key)
+
+    fw_producer = producer.load_data(batch_size, latest_fw_state)
+    for watermark, fws_list in fw_producer:
+        persons_list = filmography.load_persons([fw.id for fw in fws_list]) if fws_list else []
+        if persons_list:
+            person_ids = [person.id for person in persons_list]
+            transform.create_documents(persons_list, filmography.load_data(person_ids, batch_size))
+            elastic_saver.write_to_index(
+                transform.base_dict.values(),
+            )
+
+        state.set_watermark(conf.film_works_state_key, watermark.updated_at, watermark.id)
 
 
 def main():
@@ -59,9 +92,22 @@ def main():
     state = State(storage)
     portion_size = conf.data_batch_size
     es = Elasticsearch(conf.elastic_url)
+    publisher = ChangesPublisher(
+        redis.Redis(host=conf.redis_host, port=conf.redis_port),
+        conf.cache_invalidation_channel,
+    )
+    elastic_saver = ElasticsearchLoader(
+        es, conf.elastic_index_name, conf.index_json_path, conf.elastic_index_version, publisher,
+    )
+    if not elastic_saver.alias_switched:
+        # Новая версия индекса заполняется с начала выгрузки
+        for state_key in (conf.table_name, conf.film_works_state_key):
+            state.set_state(state_key, None)
     with pg_conn:
         while True:
-            run_persons_etl(es, pg_conn, portion_size, state)
+            run_persons_etl(elastic_saver, pg_conn, portion_size, state)
+            run_filmography_etl(elastic_saver, pg_conn, portion_size, state)
+            elastic_saver.switch_alias()
     pg_conn.close()
 
 
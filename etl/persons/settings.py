@@ -1,13 +1,15 @@
 from common.etl_settings import ETLSettings
 
 
-class GenresSettings(ETLSettings):
+class PersonsSettings(ETLSettings):
     """Настройки приложения."""
 
     elastic_index_name: str = 'persons'
     index_json_path: str = 'app/indices/persons.json'
 
     table_name: str = 'persons'
+    # Ключ состояния обхода кинопроизведений для обновления фильмографии персон
+    film_works_state_key: str = 'persons_film_work'
 
 
-conf = GenresSettings()
+conf = PersonsSettings()
@@ -1,6 +1,7 @@
 from typing import Iterator
 
 from common.models.main import Person
+from common.models.utils_sql import FilmographyResult
 
 
 class Transform:
@@ -13,11 +14,13 @@ class Transform:
     def create_documents(
             self,
             data_generator: Iterator[Person],
+            filmography_generator: Iterator[Iterator[FilmographyResult]],
     ):
         """Строит набор документов для записи в elastic.
 
         Args:
             data_generator: Данные для построения документа
+            filmography_generator: Фильмография персон
         """
         self.base_dict = {}
 
@@ -25,5 +28,29 @@ class Transform:
             es_doc = {
                 'id': doc.id,
                 'full_name': doc.full_name,
+                'films': [],
+                'film_works': [],
             }
             self.base_dict[doc.id] = es_doc
+
+        roles = {}
+        film_works = {}
+        for filmography_batch in filmography_generator:
+            for doc in filmography_batch:
+                if doc.person_id not in self.base_dict:
+                    continue
+                person_roles = roles.setdefault(doc.person_id, {})
+                film_ids = person_roles.setdefault(doc.pfw_role, [])
+                if doc.film_work_id not in film_ids:
+                    film_ids.append(doc.film_work_id)
+                film_works.setdefault(doc.person_id, {})[doc.film_work_id] = {
+                    'id': doc.film_work_id,
+                    'title': doc.film_work_title,
+                    'imdb_rating': doc.film_work_rating,
+                }
+
+        for person_id, person_roles in roles.items():
+            self.base_dict[person_id]['films'] = [
+                {'role': role, 'film_ids': film_ids} for role, film_ids in person_roles.items()
+            ]
+            self.base_dict[person_id]['film_works'] = list(film_works[person_id].values())
@@ -0,0 +1,82 @@
+"""Сравнение поиска документов по идентификатору через search и через get/mget.
+
+Запуск (из каталога fastapi-solution):
+
+    python benchmarks/id_lookup.py --host localhost --index persons --count 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from elasticsearch import AsyncElasticsearch
+
+
+async def search_one(es: AsyncElasticsearch, index: str, doc_id: str):
+    """Поиск документа запросом match_phrase по полю id."""
+    await es.search(index=index, body={'query': {'bool': {'must': [{'match_phrase': {'id': doc_id}}]}}})
+
+
+async def get_one(es: AsyncElasticsearch, index: str, doc_id: str):
+    """Чтение документа по _id."""
+    await es.get(index=index, id=doc_id)
+
+
+async def search_many(es: AsyncElasticsearch, index: str, doc_ids: List[str]):
+    """Поиск набора документов запросом terms по полю id."""
+    await es.search(index=index, body={'size': len(doc_ids), 'query': {'terms': {'id': doc_ids}}})
+
+
+async def get_many(es: AsyncElasticsearch, index: str, doc_ids: List[str]):
+    """Чтение набора документов по _id одним запросом mget."""
+    await es.mget(index=index, body={'ids': doc_ids})
+
+
+async def measure(name: str, calls: List[Callable[[], Awaitable]]):
+    """Последовательно выполняет запросы и печатает задержки в миллисекундах."""
+    timings = []
+    for call in calls:
+        started_at = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    timings.sort()
+    print(  # noqa: T001
+        f'{name:<24} n={len(timings):<5} '
+        f'mean={statistics.mean(timings):7.2f}ms '
+        f'p50={timings[len(timings) // 2]:7.2f}ms '
+        f'p99={timings[int(len(timings) * 0.99)]:7.2f}ms',
+    )
+
+
+async def main(args: argparse.Namespace):
+    """Выбирает идентификаторы из индекса и сравнивает оба способа их чтения."""
+    es = AsyncElasticsearch(hosts=[f'http://{args.host}:{args.port}'])
+    try:
+        docs = await es.search(index=args.index, body={'size': args.count, '_source': ['id']})
+        doc_ids = [hit['_source']['id'] for hit in docs['hits']['hits']]
+        batches = [doc_ids[i:i + args.batch] for i in range(0, len(doc_ids), args.batch)]
+
+        # Прогрев соединений и кэшей узла, чтобы оба способа были в равных условиях
+        await measure('warmup', [lambda doc_id=doc_id: get_one(es, args.index, doc_id) for doc_id in doc_ids])
+
+        await measure('search match_phrase', [
+            lambda doc_id=doc_id: search_one(es, args.index, doc_id) for doc_id in doc_ids
+        ])
+        await measure('get', [lambda doc_id=doc_id: get_one(es, args.index, doc_id) for doc_id in doc_ids])
+        await measure(f'search terms x{args.batch}', [
+            lambda batch=batch: search_many(es, args.index, batch) for batch in batches
+        ])
+        await measure(f'mget x{args.batch}', [lambda batch=batch: get_many(es, args.index, batch) for batch in batches])
+    finally:
+        await es.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=9200)
+    parser.add_argument('--index', default='persons')
+    parser.add_argument('--count', type=int, default=200, help='Число идентификаторов')
+    parser.add_argument('--batch', type=int, default=50, help='Размер пакета для mget')
+    asyncio.run(main(parser.parse_args()))
@@ -19,6 +19,30 @@ class PersonNotFound(HTTPException):
         super().__init__(HTTPStatus.NOT_FOUND, 'Person not found')
 
 
+class PageTooDeep(HTTPException):
+    """Класс-ответ для случая запроса страницы за пределами окна выдачи."""
+
+    def __init__(self):
+        """Инициализация класса."""
+        super().__init__(HTTPStatus.BAD_REQUEST, 'Page is too deep, use cursor pagination')
+
+
+class InvalidCursor(HTTPException):
+    """Класс-ответ для случая поврежденного или просроченного курсора."""
+
+    def __init__(self):
+        """Инициализация класса."""
+        super().__init__(HTTPStatus.BAD_REQUEST, 'Invalid or expired cursor')
+
+
+class InvalidFilter(HTTPException):
+    """Класс-ответ для случая неразборчивого значения фильтра."""
+
+    def __init__(self, key: str):
+        """Инициализация класса."""
+        super().__init__(HTTPStatus.BAD_REQUEST, f'Invalid value of filter[{key}]')
+
+
 class GenreNotFound(HTTPException):
     """Класс-ответ для случая отсутствия жанра."""
 
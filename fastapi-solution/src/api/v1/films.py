@@ -1,15 +1,38 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 
-from api.v1.errors import FilmNotFound
-from api.v1.schemas.films import ShortFilm, Film, Person, Genre
-from api.v1.utils import Paginator, get_filter
+from api.v1.errors import FilmNotFound, InvalidCursor
+from api.v1.schemas.films import (
+    ShortFilm, Film, FilmFacets, FilmsBatchRequest, FilmSuggestion, GenreFacet, Person, Genre, RatingBucket,
+)
+from api.v1.utils import Paginator, cursor_response, get_filter
+from services.cache_keys import films_facets_key, scope_films_key, search_films_key
+from models.main import Film as FilmModel
 from services.films import FilmService, get_film_service
+from core.config import get_settings
+from services.pagination import CursorError
+from services.response_cache import ResponseCache, get_response_cache
+
+conf = get_settings()
 
 router = APIRouter()
 
 
+def film_to_schema(film: FilmModel) -> Film:
+    """Преобразует модель фильма в схему ответа."""
+    return Film(
+        uuid=film.id,
+        title=film.title,
+        imdb_rating=film.imdb_rating,
+        description=film.description,
+        genres=[Genre(uuid=genre.id, name=genre.name) for genre in film.genres],
+        actors=[Person(uuid=person.id, full_name=person.full_name) for person in film.actors],
+        writers=[Person(uuid=person.id, full_name=person.full_name) for person in film.writers],
+        directors=[Person(uuid=person.id, full_name=person.full_name) for person in film.directors],
+    )
+
+
 @router.get(
     '/',
     response_model=List[ShortFilm],
@@ -22,25 +45,73 @@ async def films_scope(
         film_service: FilmService = Depends(get_film_service),
         filter: dict = Depends(get_filter),
         sort: str = Query(default='-imdb_rating', description='Сортировка'),
-) -> List[ShortFilm]:
+        response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
     """
     Возвращает отсортированный и отфильтрованный список фильмов со следующим содержимым:
 
     - **uuid**: идентификатор
     - **title**: название
     - **imdb_rating**: рейтинг imdb
+
+    С параметром cursor выдача идет по курсору, курсор следующей страницы возвращается в заголовке X-Next-Cursor.
     """
-    from_ = ((paginator.page_number - 1) * paginator.page_size) if (paginator.page_number > 1) else 0
+    if paginator.cursor is not None:
+        try:
+            films, next_cursor = await film_service.get_scope_films_page(
+                size=paginator.page_size, filter=filter, sort=sort, cursor=paginator.cursor,
+            )
+        except CursorError:
+            raise InvalidCursor()
+        return cursor_response([ShortFilm(
+            uuid=item.id,
+            title=item.title,
+            imdb_rating=item.imdb_rating,
+        ) for item in films], next_cursor)
+
+    from_ = paginator.offset
+    cache_key = scope_films_key(from_, paginator.page_size, filter, sort)
+    cached_response = await response_cache.get(request, cache_key)
+    if cached_response:
+        return cached_response
+
     films = await film_service.get_scope_films(
-        from_=from_, size=paginator.page_size, filter=filter, sort=sort, url=request.url._url,
+        from_=from_, size=paginator.page_size, filter=filter, sort=sort,
     )
     if not films:
         raise FilmNotFound()
-    return [ShortFilm(
+    return await response_cache.put(request, cache_key, [ShortFilm(
         uuid=item.id,
         title=item.title,
         imdb_rating=item.imdb_rating,
-    ) for item in films]
+    ) for item in films])
+
+
+@router.get('/facets', response_model=FilmFacets, summary='Число фильмов по жанрам и рейтингу для фильтра')
+async def films_facets(
+        request: Request,
+        film_service: FilmService = Depends(get_film_service),
+        filter: dict = Depends(get_filter),
+        response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
+    """
+    Возвращает агрегаты по фильмам, удовлетворяющим тому же фильтру, что и список фильмов:
+
+    - **genres**: число фильмов каждого жанра
+    - **imdb_rating**: гистограмма рейтинга imdb
+    """
+    cache_key = films_facets_key(filter)
+    cached_response = await response_cache.get(request, cache_key)
+    if cached_response:
+        return cached_response
+
+    facets = await film_service.get_facets(filter=filter)
+    return await response_cache.put(request, cache_key, FilmFacets(
+        genres=[GenreFacet(uuid=genre.id, name=genre.name, count=genre.count) for genre in facets.genres],
+        imdb_rating=[
+            RatingBucket(rating_from=bucket.rating_from, count=bucket.count) for bucket in facets.imdb_rating
+        ],
+    ))
 
 
 @router.get('/search', response_model=List[ShortFilm], summary='Найти список фильмов по совпадению')
@@ -49,7 +120,8 @@ async def film_search(
         query: str,
         film_service: FilmService = Depends(get_film_service),
         paginator: Paginator = Depends(),
-) -> List[ShortFilm]:
+        response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
     """
     Возвращает список фильмов, удовлетворяющих поиску со следующим содержимым:
 
@@ -61,18 +133,67 @@ async def film_search(
     - **actors**: список актеров - участников фильма
     - **writers**: список сценаристов - участников фильма
     - **directors**: список режиссеров - участников фильма
+
+    С параметром cursor выдача идет по курсору, курсор следующей страницы возвращается в заголовке X-Next-Cursor.
     """
-    from_ = ((paginator.page_number - 1) * paginator.page_size) if (paginator.page_number > 1) else 0
+    if paginator.cursor is not None:
+        try:
+            films, next_cursor = await film_service.search_film_page(
+                query=query, size=paginator.page_size, cursor=paginator.cursor,
+            )
+        except CursorError:
+            raise InvalidCursor()
+        return cursor_response([ShortFilm(
+            uuid=item.id,
+            title=item.title,
+            imdb_rating=item.imdb_rating,
+        ) for item in films], next_cursor)
+
+    from_ = paginator.offset
+    cache_key = search_films_key(query, from_, paginator.page_size)
+    cached_response = await response_cache.get(request, cache_key)
+    if cached_response:
+        return cached_response
+
     films = await film_service.search_film(
-        from_=from_, size=paginator.page_size, query=query, url=request.url._url,
+        from_=from_, size=paginator.page_size, query=query,
     )
     if not films:
         raise FilmNotFound()
-    return [ShortFilm(
+    return await response_cache.put(request, cache_key, [ShortFilm(
         uuid=item.id,
         title=item.title,
         imdb_rating=item.imdb_rating,
-    ) for item in films]
+    ) for item in films])
+
+
+@router.get('/suggest', response_model=List[FilmSuggestion], summary='Подсказки по началу названия фильма')
+async def films_suggest(
+        query: str = Query(..., min_length=1, description='Начало названия'),
+        size: int = Query(default=conf.SUGGEST_SIZE, ge=1, le=conf.SUGGEST_SIZE, description='Число подсказок'),
+        film_service: FilmService = Depends(get_film_service),
+) -> List[FilmSuggestion]:
+    """
+    Возвращает подсказки для ввода названия фильма со следующим содержимым:
+
+    - **uuid**: идентификатор
+    - **title**: название
+    """
+    suggestions = await film_service.suggest(query, size)
+    return [FilmSuggestion(uuid=item.id, title=item.title) for item in suggestions]
+
+
+@router.post('/batch', response_model=List[Optional[Film]], summary='Поиск фильмов по списку идентификаторов')
+async def films_batch(
+        batch: FilmsBatchRequest, film_service: FilmService = Depends(get_film_service),
+) -> List[Optional[Film]]:
+    """
+    Возвращает фильмы в порядке запрошенных идентификаторов, null - для ненайденных.
+
+    Содержимое фильма такое же, как у поиска фильма по идентификатору.
+    """
+    films = await film_service.get_many(batch.ids)
+    return [film_to_schema(film) if film else None for film in films]
 
 
 @router.get('/{film_id}', response_model=Film, summary='Поиск фильма по идентификатору')
@@ -94,14 +215,4 @@ async def film_details(
     film = await film_service.get_by_id(film_id)
     if not film:
         raise FilmNotFound()
-    result = Film(
-        uuid=film.id,
-        title=film.title,
-        imdb_rating=film.imdb_rating,
-        description=film.description,
-        genres=[Genre(uuid=genre.id, name=genre.name) for genre in film.genres],
-        actors=[Person(uuid=person.id, full_name=person.full_name) for person in film.actors],
-        writers=[Person(uuid=person.id, full_name=person.full_name) for person in film.writers],
-        directors=[Person(uuid=person.id, full_name=person.full_name) for person in film.directors],
-    )
-    return result
+    return film_to_schema(film)
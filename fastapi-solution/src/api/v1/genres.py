@@ -1,10 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 
 from api.v1.errors import GenreNotFound
 from api.v1.schemas.genres import Genre
+from services.cache_keys import genres_list_key
 from services.genres import GenreService, get_genre_service
+from services.response_cache import ResponseCache, get_response_cache
 
 router = APIRouter()
 
@@ -31,14 +33,20 @@ async def genre_details(
 async def genres_list(
         request: Request,
         genre_service: GenreService = Depends(get_genre_service),
-) -> List[Genre]:
+        response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
     """
     Возвращает список жанров со следующей информацией:
 
     - **uuid**: идентификатор
     - **name**: название
     """
-    genres = await genre_service.get_genres_list(url=request.url._url)
+    cache_key = genres_list_key()
+    cached_response = await response_cache.get(request, cache_key)
+    if cached_response:
+        return cached_response
+
+    genres = await genre_service.get_genres_list()
 
     if not genres:
         raise GenreNotFound()
@@ -47,4 +55,4 @@ async def genres_list(
     for genre in genres:
         genre_model = Genre(uuid=genre.id, name=genre.name)
         result.append(genre_model)
-    return result
+    return await response_cache.put(request, cache_key, result)
@@ -1,16 +1,27 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, Request, Query
+from fastapi import APIRouter, Depends, Request, Query, Response
 
-from api.v1.errors import PersonNotFound
-from api.v1.schemas.persons import FilmByPerson, Person
-from api.v1.utils import Paginator
-from services.films import FilmService, get_film_service
+from api.v1.errors import InvalidCursor, PersonNotFound
+from api.v1.schemas.persons import FilmByPerson, Person, PersonSuggestion
+from api.v1.utils import Paginator, cursor_response
+from core.config import get_settings
+from models.main import Person as PersonModel
+from services.cache_keys import search_persons_key
+from services.pagination import CursorError
 from services.persons import PersonService, get_person_service
+from services.response_cache import ResponseCache, get_response_cache
+
+conf = get_settings()
 
 router = APIRouter()
 
 
+def person_to_schema(person: PersonModel) -> Person:
+    """Преобразует модель персоны в схему ответа."""
+    return Person(uuid=person.id, full_name=person.full_name, films=person.films)
+
+
 @router.get(
     '/{person_id}/film',
     response_model=List[FilmByPerson],
@@ -18,7 +29,7 @@ router = APIRouter()
 )
 async def films_by_person(
         person_id: str,
-        film_service: FilmService = Depends(get_film_service),
+        person_service: PersonService = Depends(get_person_service),
 ) -> List[FilmByPerson]:
     """
     Возвращает список фильмов, где участвовал персонаж со следующим содержимым:
@@ -27,8 +38,8 @@ async def films_by_person(
     - **full_name**: полное имя
     - **films**: фильмы, где участвовал
     """
-    fws_by_person = await film_service.get_films_by_person(person_id)
-    if not fws_by_person:
+    person = await person_service.get_by_id(person_id)
+    if not person or not person.film_works:
         raise PersonNotFound()
 
     return [
@@ -36,7 +47,7 @@ async def films_by_person(
             uuid=fw.id,
             title=fw.title,
             imdb_rating=fw.imdb_rating,
-        ) for fw in fws_by_person
+        ) for fw in person.film_works
     ]
 
 
@@ -46,40 +57,61 @@ async def search_persons(
         query: str = Query(..., description='Поисковой запрос'),
         paginator: Paginator = Depends(),
         person_service: PersonService = Depends(get_person_service),
-        film_service: FilmService = Depends(get_film_service),
-) -> List[Person]:
+        response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
     """
     Возвращает список всех персон, удовлетворяющих условиям поиска со следующим содержимым:
 
     - **uuid**: идентификатор
     - **full_name**: полное имя
     - **films**: фильмы, где участвовал
+
+    С параметром cursor выдача идет по курсору, курсор следующей страницы возвращается в заголовке X-Next-Cursor.
     """
-    from_ = ((paginator.page_number - 1) * paginator.page_size) if (paginator.page_number > 1) else 0
+    if paginator.cursor is not None:
+        try:
+            persons, next_cursor = await person_service.search_person_page(
+                query=query, size=paginator.page_size, cursor=paginator.cursor,
+            )
+        except CursorError:
+            raise InvalidCursor()
+        return cursor_response([person_to_schema(person) for person in persons], next_cursor)
+
+    from_ = paginator.offset
+    cache_key = search_persons_key(query, from_, paginator.page_size)
+    cached_response = await response_cache.get(request, cache_key)
+    if cached_response:
+        return cached_response
+
     persons = await person_service.search_person(
-        from_=from_, size=paginator.page_size, query=query, url=request.url._url,
+        from_=from_, size=paginator.page_size, query=query,
     )
     if not persons:
         raise PersonNotFound()
 
-    person_ids = [person.id for person in persons]
-    fw_person_info = await film_service.get_person_by_ids(person_ids)
-    full_persons = await person_service.enrich_persons_list_data(persons, fw_person_info)
+    return await response_cache.put(request, cache_key, [person_to_schema(person) for person in persons])
 
-    return [
-        Person(
-            uuid=person.id,
-            full_name=person.full_name,
-            films=person.films,
-        ) for person in full_persons
-    ]
+
+@router.get('/suggest', response_model=List[PersonSuggestion], summary='Подсказки по началу имени участника')
+async def persons_suggest(
+        query: str = Query(..., min_length=1, description='Начало имени'),
+        size: int = Query(default=conf.SUGGEST_SIZE, ge=1, le=conf.SUGGEST_SIZE, description='Число подсказок'),
+        person_service: PersonService = Depends(get_person_service),
+) -> List[PersonSuggestion]:
+    """
+    Возвращает подсказки для ввода имени участника фильма со следующим содержимым:
+
+    - **uuid**: идентификатор
+    - **full_name**: полное имя
+    """
+    suggestions = await person_service.suggest(query, size)
+    return [PersonSuggestion(uuid=item.id, full_name=item.full_name) for item in suggestions]
 
 
 @router.get('/{person_id}', response_model=Person, summary='Найти участника фильма по идентификатору')
 async def person_details(
         person_id: str,
         person_service: PersonService = Depends(get_person_service),
-        film_service: FilmService = Depends(get_film_service),
 ) -> Person:
     """
     Возвращает подробную информацию об участнике фильма со следующим содержимым:
@@ -91,6 +123,4 @@ async def person_details(
     person = await person_service.get_by_id(person_id)
     if not person:
         raise PersonNotFound()
-    fw_person_info = await film_service.get_person_by_id(person_id)
-    person = await person_service.enrich_person_data(person, fw_person_info)
-    return Person(uuid=person.id, full_name=person.full_name, films=person.films)
+    return person_to_schema(person)
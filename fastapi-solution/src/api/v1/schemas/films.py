@@ -1,6 +1,9 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, conlist
+
+# Максимальное число фильмов в одном пакетном запросе
+BATCH_MAX_SIZE = 100
 
 
 class Genre(BaseModel):
@@ -30,6 +33,41 @@ class Film(BaseModel):
     directors: List[Person] = []
 
 
+class FilmsBatchRequest(BaseModel):
+    """Схема пакетного запроса фильмов."""
+
+    ids: conlist(str, min_items=1, max_items=BATCH_MAX_SIZE)
+
+
+class GenreFacet(BaseModel):
+    """Схема числа фильмов жанра."""
+
+    uuid: str
+    name: str
+    count: int
+
+
+class RatingBucket(BaseModel):
+    """Схема интервала гистограммы рейтинга."""
+
+    rating_from: float
+    count: int
+
+
+class FilmFacets(BaseModel):
+    """Схема фасетов списка фильмов."""
+
+    genres: List[GenreFacet] = []
+    imdb_rating: List[RatingBucket] = []
+
+
+class FilmSuggestion(BaseModel):
+    """Схема подсказки по названию фильма."""
+
+    uuid: str
+    title: str
+
+
 class ShortFilm(BaseModel):
     """Схема урезанной версии фильма."""
 
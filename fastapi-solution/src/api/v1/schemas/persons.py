@@ -18,9 +18,16 @@ class Person(BaseModel):
     films: List[Optional[PersonFilm]] = []
 
 
+class PersonSuggestion(BaseModel):
+    """Модель подсказки по имени персоны."""
+
+    uuid: str
+    full_name: str
+
+
 class FilmByPerson(BaseModel):
     """Модель для представления получения фильмов по персоне."""
 
     uuid: str
     title: str
-    imdb_rating: float
+    imdb_rating: Optional[float]
@@ -0,0 +1,48 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    """Схема статистики одного уровня кэша."""
+
+    name: str
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+
+class RedisServerStats(BaseModel):
+    """Схема серверной статистики Redis."""
+
+    keyspace_hits: int
+    keyspace_misses: int
+    evicted_keys: int
+    expired_keys: int
+
+
+class ElasticNodeStats(BaseModel):
+    """Схема статистики запросов к узлу elasticsearch."""
+
+    base_url: str
+    requests: int
+    errors: int
+    mean_time: float
+    max_time: float
+    in_flight: int
+    max_in_flight: int
+
+
+class ElasticStatsResponse(BaseModel):
+    """Схема статистики запросов к elasticsearch."""
+
+    connections_per_node: int
+    nodes: List[ElasticNodeStats]
+
+
+class CacheStatsResponse(BaseModel):
+    """Схема статистики всех уровней кэша."""
+
+    caches: List[CacheStats]
+    redis: RedisServerStats
@@ -0,0 +1,67 @@
+from aioredis import Redis
+from fastapi import APIRouter, Depends
+
+from api.v1.schemas.stats import (
+    CacheStats, CacheStatsResponse, ElasticNodeStats, ElasticStatsResponse, RedisServerStats,
+)
+from core.config import get_settings
+from db.elastic import get_node_stats
+from db.redis import get_redis
+from services.cache import get_all_cache_stats
+
+conf = get_settings()
+
+router = APIRouter()
+
+
+@router.get('/cache', response_model=CacheStatsResponse, summary='Статистика кэшей')
+async def cache_stats(redis: Redis = Depends(get_redis)) -> CacheStatsResponse:
+    """
+    Возвращает статистику попаданий и вытеснений по уровням кэша:
+
+    - **caches**: счетчики внутрипроцессных кэшей и обращений к Redis текущего воркера
+    - **redis**: серверные счетчики Redis (общие для всех воркеров)
+    """
+    server_stats = (await redis.info('stats'))['stats']
+    return CacheStatsResponse(
+        caches=[
+            CacheStats(
+                name=stats.name,
+                hits=stats.hits,
+                misses=stats.misses,
+                evictions=stats.evictions,
+                hit_ratio=stats.hit_ratio,
+            ) for stats in get_all_cache_stats()
+        ],
+        redis=RedisServerStats(
+            keyspace_hits=server_stats['keyspace_hits'],
+            keyspace_misses=server_stats['keyspace_misses'],
+            evicted_keys=server_stats['evicted_keys'],
+            expired_keys=server_stats['expired_keys'],
+        ),
+    )
+
+
+@router.get('/elastic', response_model=ElasticStatsResponse, summary='Статистика запросов к elasticsearch')
+async def elastic_stats() -> ElasticStatsResponse:
+    """
+    Возвращает статистику запросов текущего воркера к узлам elasticsearch:
+
+    - **connections_per_node**: размер пула соединений к узлу
+    - **nodes**: число запросов и ошибок, среднее и максимальное время запроса в секундах,
+      текущее и максимальное число одновременных запросов к узлу
+    """
+    return ElasticStatsResponse(
+        connections_per_node=conf.ELASTIC_CONNECTIONS_PER_NODE,
+        nodes=[
+            ElasticNodeStats(
+                base_url=stats.base_url,
+                requests=stats.requests,
+                errors=stats.errors,
+                mean_time=stats.mean_time,
+                max_time=stats.max_time,
+                in_flight=stats.in_flight,
+                max_in_flight=stats.max_in_flight,
+            ) for stats in get_node_stats()
+        ],
+    )
@@ -1,19 +1,47 @@
 import re
+from typing import Any, Optional
 
-from fastapi import Query, Request
+import orjson
+from fastapi import Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from models.common import FilterNestedValues, FilterSimpleValues
 from pydantic import BaseModel
 
+from api.v1.errors import InvalidFilter, PageTooDeep
+from core.config import get_settings
+from services.query_builder import normalize_filter_value
+
+conf = get_settings()
+
 
 class Paginator(BaseModel):
-    """Модель для пагинации."""
+    """Модель для пагинации.
+
+    Неглубокие страницы запрашиваются по номеру, глубокие - по курсору
+    из заголовка X-Next-Cursor предыдущего ответа.
+    """
 
     page_size: int = Query(default=50, alias='size', ge=1)
     page_number: int = Query(default=0, alias='number')
+    cursor: Optional[str] = Query(default=None, description='Курсор страницы, пустая строка - начало выдачи')
+
+    @property
+    def offset(self) -> int:
+        """Возвращает смещение страницы по ее номеру."""
+        offset = ((self.page_number - 1) * self.page_size) if (self.page_number > 1) else 0
+        if offset + self.page_size > conf.ELASTIC_MAX_RESULT_WINDOW:
+            raise PageTooDeep()
+        return offset
+
+
+def cursor_response(content: Any, next_cursor: Optional[str]) -> Response:
+    """Возвращает ответ со страницей выдачи и курсором следующей страницы."""
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+    return Response(content=orjson.dumps(jsonable_encoder(content)), media_type='application/json', headers=headers)
 
 
 def validate_filter_values(filter_: dict) -> dict:
-    """Валидирует фильтр запроса."""
+    """Валидирует фильтр запроса и приводит значения к каноническому виду."""
     result_filter = {}
 
     filter_nested_values = FilterNestedValues.get_values()
@@ -21,7 +49,12 @@ def validate_filter_values(filter_: dict) -> dict:
 
     for key, val in filter_.items():
         if key in filter_nested_values or key in filter_simple_values:
-            result_filter[key] = val
+            try:
+                value = normalize_filter_value(key, val)
+            except ValueError:
+                raise InvalidFilter(key)
+            if value:
+                result_filter[key] = value
 
     return result_filter
 
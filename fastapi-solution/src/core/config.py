@@ -2,10 +2,16 @@ import os
 from functools import lru_cache
 from logging import config as logging_config
 
-from pydantic import BaseSettings
+from typing import List, Optional
+
+from pydantic import BaseSettings, root_validator
 
 from core.logger import LOGGING
 
+# Время хранения сущностей в кэше со сбросом по оповещениям ETL и без него
+INVALIDATED_ENTITY_CACHE_EXPIRE_IN_SECONDS = 60 * 60 * 6
+ENTITY_CACHE_EXPIRE_IN_SECONDS = 60 * 5
+
 
 class Settings(BaseSettings):
     """Настройки приложения."""
@@ -23,14 +29,90 @@ class Settings(BaseSettings):
     # Настройки Elasticsearch
     ELASTIC_HOST: str = 'elastic'
     ELASTIC_PORT: int = 9200
+    # Адреса узлов кластера вида http://host:port, если не заданы - используются ELASTIC_HOST и ELASTIC_PORT
+    ELASTIC_HOSTS: List[str] = []
+    # Размер пула соединений к каждому узлу
+    ELASTIC_CONNECTIONS_PER_NODE: int = 50
+    ELASTIC_HTTP_COMPRESS: bool = True
+    ELASTIC_REQUEST_TIMEOUT_IN_SECONDS: float = 5.0
+    # Повтор по таймауту умножает время ответа на число попыток, поэтому по умолчанию выключен
+    ELASTIC_RETRY_ON_TIMEOUT: bool = False
+    ELASTIC_MAX_RETRIES: int = 1
+    # Обнаружение узлов кластера при старте и при отказе узла
+    ELASTIC_SNIFF_ON_START: bool = False
+    ELASTIC_SNIFF_ON_NODE_FAILURE: bool = False
+    ELASTIC_MIN_DELAY_BETWEEN_SNIFFING_IN_SECONDS: float = 60.0
+    # Предел from + size постраничной выдачи (index.max_result_window), глубже - только по курсору
+    ELASTIC_MAX_RESULT_WINDOW: int = 10000
+    # Время жизни point in time между запросами страниц по курсору
+    ELASTIC_PIT_KEEP_ALIVE: str = '1m'
+    # Искать по полю id документы, не найденные по _id: старые документы записаны с другим _id.
+    # После переиндексации ETL с _id, равным id, можно выключить, чтобы промах стоил одного запроса
+    ELASTIC_ID_LOOKUP_FALLBACK: bool = True
 
     # Корень проекта
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-    # Время хранения данных в кэше
-    FILM_CACHE_EXPIRE_IN_SECONDS: int = 60 * 5
-    GENRE_CACHE_EXPIRE_IN_SECONDS: int = 60 * 5
-    PERSON_CACHE_EXPIRE_IN_SECONDS: int = 60 * 5
+    # Версия схемы ключей кэша, увеличивается при несовместимом изменении формата записей
+    CACHE_KEY_VERSION: int = 1
+
+    # Время хранения данных в кэше. Если не задано, сущности живут долго только
+    # при сбросе по оповещениям ETL, а списки и поисковые выдачи - до истечения TTL
+    FILM_CACHE_EXPIRE_IN_SECONDS: Optional[int] = None
+    GENRE_CACHE_EXPIRE_IN_SECONDS: Optional[int] = None
+    PERSON_CACHE_EXPIRE_IN_SECONDS: Optional[int] = None
+    LIST_CACHE_EXPIRE_IN_SECONDS: int = 60 * 5
+
+    # Сколько еще отдается устаревшая запись кэша, пока она обновляется в фоне
+    CACHE_STALE_IN_SECONDS: int = 60 * 5
+    # Коэффициент раннего вероятностного обновления кэша (XFetch), 0 - отключено
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+
+    # Настройки кэша готовых ответов списочных ручек
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_EXPIRE_IN_SECONDS: int = 60 * 5
+
+    # Канал Redis, в который ETL публикует идентификаторы измененных документов
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = 'cache_invalidation'
+
+    # Профиль поиска фильмов: короткие поля ищутся нечетко, длинные - только точно
+    FILM_SEARCH_FUZZY_FIELDS: List[str] = [
+        'title^3', 'actors_names^2', 'directors_names^2', 'writers_names', 'genres_names',
+    ]
+    FILM_SEARCH_EXACT_FIELDS: List[str] = ['description']
+    SEARCH_FUZZINESS: str = 'AUTO'
+    # Число первых символов слова, в которых опечатки не ищутся
+    SEARCH_PREFIX_LENGTH: int = 1
+    SEARCH_MAX_EXPANSIONS: int = 50
+    # Предел точного подсчета числа найденных документов
+    SEARCH_TRACK_TOTAL_HITS: int = 1000
+    # Сколько первых результатов поиска кэшируется одним списком для всех страниц
+    SEARCH_HITS_WINDOW: int = 200
+
+    # Настройки фасетов списка фильмов: число жанров и шаг гистограммы рейтинга
+    FACETS_GENRES_SIZE: int = 100
+    FACETS_RATING_INTERVAL: float = 1.0
+
+    # Настройки подсказок при наборе запроса: размер, бюджет времени ответа и время хранения в кэше
+    SUGGEST_SIZE: int = 10
+    SUGGEST_TIMEOUT_IN_SECONDS: float = 0.2
+    SUGGEST_CACHE_EXPIRE_IN_SECONDS: int = 60
+
+    # Настройки внутрипроцессного кэша разобранных моделей
+    MEMORY_CACHE_MAX_SIZE: int = 1024
+    MEMORY_CACHE_EXPIRE_IN_SECONDS: int = 30
+
+    @root_validator
+    def set_entity_cache_expire(cls, values: dict) -> dict:
+        """Выбирает время хранения сущностей по включенности сброса кэша."""
+        expire = ENTITY_CACHE_EXPIRE_IN_SECONDS
+        if values.get('CACHE_INVALIDATION_ENABLED'):
+            expire = INVALIDATED_ENTITY_CACHE_EXPIRE_IN_SECONDS
+        for name in ('FILM_CACHE_EXPIRE_IN_SECONDS', 'GENRE_CACHE_EXPIRE_IN_SECONDS', 'PERSON_CACHE_EXPIRE_IN_SECONDS'):
+            if values.get(name) is None:
+                values[name] = expire
+        return values
 
     class Config:
         """Дополнительные базовые настройки."""
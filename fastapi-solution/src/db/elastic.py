@@ -1,10 +1,86 @@
-from typing import Optional
+import time
+from typing import Dict, List, Optional
 
+from elastic_transport import AiohttpHttpNode
 from elasticsearch import AsyncElasticsearch
 
+from core.config import get_settings
+
+conf = get_settings()
+
 es: Optional[AsyncElasticsearch] = None
 
 
+class NodeStats:
+    """Счетчики запросов к одному узлу elasticsearch.
+
+    Число одновременных запросов показывает, насколько загружен пул
+    соединений узла (ELASTIC_CONNECTIONS_PER_NODE).
+    """
+
+    def __init__(self, base_url: str):
+        """Инициализация счетчиков."""
+        self.base_url = base_url
+        self.requests = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def mean_time(self) -> float:
+        """Среднее время запроса в секундах."""
+        return self.total_time / self.requests if self.requests else 0.0
+
+
+_node_stats: Dict[str, NodeStats] = {}
+
+
+def get_node_stats() -> List[NodeStats]:
+    """Возвращает счетчики запросов ко всем узлам."""
+    return list(_node_stats.values())
+
+
+class TimedAiohttpHttpNode(AiohttpHttpNode):
+    """Узел elasticsearch, замеряющий время и параллельность своих запросов."""
+
+    async def perform_request(self, *args, **kwargs):
+        """Выполняет запрос к узлу, обновляя его счетчики."""
+        stats = _node_stats.setdefault(self.base_url, NodeStats(self.base_url))
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        started_at = time.perf_counter()
+        try:
+            return await super().perform_request(*args, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            stats.in_flight -= 1
+            stats.requests += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+
+
+def create_elastic() -> AsyncElasticsearch:
+    """Создает клиент elasticsearch с настройками транспорта из конфигурации."""
+    hosts = conf.ELASTIC_HOSTS or [f'http://{conf.ELASTIC_HOST}:{conf.ELASTIC_PORT}']
+    return AsyncElasticsearch(
+        hosts=hosts,
+        node_class=TimedAiohttpHttpNode,
+        connections_per_node=conf.ELASTIC_CONNECTIONS_PER_NODE,
+        http_compress=conf.ELASTIC_HTTP_COMPRESS,
+        request_timeout=conf.ELASTIC_REQUEST_TIMEOUT_IN_SECONDS,
+        retry_on_timeout=conf.ELASTIC_RETRY_ON_TIMEOUT,
+        max_retries=conf.ELASTIC_MAX_RETRIES,
+        sniff_on_start=conf.ELASTIC_SNIFF_ON_START,
+        sniff_on_node_failure=conf.ELASTIC_SNIFF_ON_NODE_FAILURE,
+        min_delay_between_sniffing=conf.ELASTIC_MIN_DELAY_BETWEEN_SNIFFING_IN_SECONDS,
+    )
+
+
 # Функция понадобится при внедрении зависимостей
 async def get_elastic() -> AsyncElasticsearch:
     """Возвращает экземпляр es."""
@@ -1,16 +1,17 @@
+import asyncio
 import logging
 
 import aioredis
 import uvicorn as uvicorn
-from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 
-from api.v1 import films, genres, persons
+from api.v1 import films, genres, persons, stats
 from core.config import get_settings
 from core.logger import LOGGING
 from db import elastic
 from db import redis
+from services import invalidation
 
 conf = get_settings()
 
@@ -26,12 +27,16 @@ app = FastAPI(
 async def startup():
     """Метод, выполняющий инициализацию компонентов приложения при старте."""
     redis.redis = await aioredis.create_redis_pool((conf.REDIS_HOST, conf.REDIS_PORT), minsize=10, maxsize=20)
-    elastic.es = AsyncElasticsearch(hosts=[f'http://{conf.ELASTIC_HOST}:{conf.ELASTIC_PORT}'])
+    elastic.es = elastic.create_elastic()
+    if conf.CACHE_INVALIDATION_ENABLED:
+        invalidation.listener = asyncio.ensure_future(invalidation.listen(redis.redis, elastic.es))
 
 
 @app.on_event('shutdown')
 async def shutdown():
     """Метод, выполняющий утилизацию компонентов приложения после завершения работы  приложения."""
+    if invalidation.listener:
+        invalidation.listener.cancel()
     redis.redis.close()
     await redis.redis.wait_closed()
     await elastic.es.close()
@@ -40,6 +45,7 @@ async def shutdown():
 app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
 app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
 app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
+app.include_router(stats.router, prefix='/api/v1/stats', tags=['stats'])
 
 if __name__ == '__main__':
     uvicorn.run(
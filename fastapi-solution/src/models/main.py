@@ -12,11 +12,62 @@ class PersonFilm(BaseModel):
     film_ids: List[str]
 
 
+class ShortFilm(UUIDMixin):
+    """Урезанная модель кинопроизведения для списков и поиска."""
+
+    title: str
+    imdb_rating: float
+
+
+class PersonFilmWork(UUIDMixin):
+    """Модель фильма из фильмографии персоны, у фильма может не быть рейтинга."""
+
+    title: str
+    imdb_rating: Optional[float]
+
+
+class GenreFacet(UUIDMixin):
+    """Модель числа фильмов жанра."""
+
+    name: str
+    count: int
+
+
+class RatingBucket(BaseModel):
+    """Модель интервала гистограммы рейтинга."""
+
+    rating_from: float
+    count: int
+
+
+class FilmFacets(BaseModel):
+    """Модель фасетов списка фильмов."""
+
+    genres: List[GenreFacet] = []
+    imdb_rating: List[RatingBucket] = []
+
+
+class FilmSuggestion(UUIDMixin):
+    """Модель подсказки по названию кинопроизведения."""
+
+    title: str
+
+
+class PersonSuggestion(UUIDMixin):
+    """Модель подсказки по имени персоны."""
+
+    full_name: str
+
+
 class Person(UUIDMixin):
-    """Модель персонажа."""
+    """Модель персонажа.
+
+    Документ индекса персон содержит фильмографию, которую заполняет ETL.
+    """
 
     full_name: str = Field(..., alias='name')
     films: List[Optional[PersonFilm]] = []
+    film_works: List[PersonFilmWork] = []
 
 
 class Genre(UUIDMixin):
@@ -26,11 +77,9 @@ class Genre(UUIDMixin):
     description: Optional[str]
 
 
-class Film(UUIDMixin):
+class Film(ShortFilm):
     """Модель кинопроизведения."""
 
-    title: str
-    imdb_rating: float
     description: Optional[str]
     genres: List[Genre] = []
     actors: List[Person] = []
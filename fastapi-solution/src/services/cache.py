@@ -0,0 +1,261 @@
+"""Вспомогательные компоненты кэширования сервисов."""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import orjson
+from aioredis import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    """Счетчики попаданий, промахов и вытеснений одного уровня кэша."""
+
+    def __init__(self, name: str):
+        """Инициализация счетчиков."""
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hit(self):
+        """Фиксирует попадание в кэш."""
+        self.hits += 1
+
+    def miss(self):
+        """Фиксирует промах кэша."""
+        self.misses += 1
+
+    def evict(self):
+        """Фиксирует вытеснение записи из кэша."""
+        self.evictions += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        """Доля попаданий от общего числа обращений."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_stats_registry: Dict[str, CacheStats] = {}
+
+
+def get_cache_stats(name: str) -> CacheStats:
+    """Возвращает счетчики кэша по имени, создавая их при первом обращении."""
+    if name not in _stats_registry:
+        _stats_registry[name] = CacheStats(name)
+    return _stats_registry[name]
+
+
+def get_all_cache_stats() -> List[CacheStats]:
+    """Возвращает счетчики всех зарегистрированных кэшей."""
+    return list(_stats_registry.values())
+
+
+class LRUCache:
+    """Внутрипроцессный LRU-кэш с ограничением по размеру и времени жизни записей.
+
+    Хранит уже разобранные объекты моделей, поэтому попадание в него
+    не требует ни похода в Redis, ни повторного парсинга json.
+    """
+
+    def __init__(self, name: str, max_size: int, expire: int):
+        """Инициализация кэша.
+
+        Args:
+            name: Имя кэша для сбора статистики
+            max_size: Максимальное количество записей
+            expire: Время жизни записи в секундах
+        """
+        self.max_size = max_size
+        self.expire = expire
+        self.stats = get_cache_stats(name)
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        """Возвращает текущее количество записей."""
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Возвращает значение по ключу или None, если его нет или оно устарело."""
+        item = self._data.get(key)
+        if item is None:
+            self.stats.miss()
+            return None
+
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            del self._data[key]
+            self.stats.evict()
+            self.stats.miss()
+            return None
+
+        self._data.move_to_end(key)
+        self.stats.hit()
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Кладет значение в кэш, вытесняя самые давно использованные записи."""
+        if self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.expire, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evict()
+
+    def delete(self, key: Hashable):
+        """Удаляет значение из кэша."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Очищает кэш."""
+        self._data.clear()
+
+
+class SingleFlight:
+    """Объединяет одновременные вызовы с одинаковым ключом в один.
+
+    Пока запрос по ключу выполняется, остальные вызовы с тем же ключом
+    не порождают новых запросов, а дожидаются результата уже запущенного.
+    """
+
+    def __init__(self):
+        """Инициализация словаря выполняющихся вызовов."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Выполняет func(*args) или присоединяется к уже выполняющемуся вызову с тем же ключом.
+
+        Args:
+            key: Ключ, по которому объединяются вызовы
+            func: Корутинная функция, выполняющая запрос
+            args: Аргументы функции
+
+        Returns:
+            Any: Результат выполнения func, общий для всех ожидающих
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = self._start(key, func, *args)
+        # Отмена одного из ожидающих не должна отменять общий запрос
+        return await asyncio.shield(future)
+
+    def spawn(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args):
+        """Запускает func(*args) в фоне, если по ключу еще ничего не выполняется."""
+        if key not in self._calls:
+            self._start(key, func, *args)
+
+    def _start(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args) -> asyncio.Future:
+        """Запускает вызов и регистрирует его как выполняющийся."""
+        future = asyncio.ensure_future(func(*args))
+        self._calls[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        """Убирает завершившийся вызов из словаря выполняющихся."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled() and future.exception():
+            logger.error('Cache loader for key %s failed: %s', key, future.exception())
+
+
+class CacheEntry:
+    """Запись кэша с мягким сроком жизни.
+
+    После мягкого срока запись еще отдается клиентам, но должна быть
+    обновлена в фоне. Жесткий срок жизни задается TTL ключа в Redis.
+    """
+
+    def __init__(self, data: Any, soft_expire_at: float, delta: float):
+        """Инициализация записи.
+
+        Args:
+            data: Закэшированные данные
+            soft_expire_at: Момент истечения мягкого срока жизни (unix time)
+            delta: Время, затраченное на получение данных, в секундах
+        """
+        self.data = data
+        self.soft_expire_at = soft_expire_at
+        self.delta = delta
+
+    def is_stale(self) -> bool:
+        """Проверяет, истек ли мягкий срок жизни записи."""
+        return time.time() >= self.soft_expire_at
+
+    def should_refresh(self, beta: float) -> bool:
+        """Решает, пора ли обновлять запись.
+
+        Помимо устаревших записей вероятностно (XFetch) обновляет и те,
+        мягкий срок которых скоро истечет: чем дольше вычисляются данные
+        и чем ближе срок, тем выше вероятность раннего обновления.
+
+        Args:
+            beta: Коэффициент агрессивности раннего обновления, 0 - отключено
+
+        Returns:
+            bool: Нужно ли запустить обновление записи
+        """
+        if self.is_stale():
+            return True
+        if beta <= 0 or self.delta <= 0:
+            return False
+        jitter = -self.delta * beta * math.log(1 - random.random())  # noqa: S311
+        return time.time() + jitter >= self.soft_expire_at
+
+
+def dump_entry(data: Any, expire: int, delta: float = 0) -> bytes:
+    """Сериализует данные в запись кэша с мягким сроком жизни.
+
+    Args:
+        data: Данные, приводимые к json
+        expire: Мягкий срок жизни записи в секундах
+        delta: Время, затраченное на получение данных, в секундах
+
+    Returns:
+        bytes: Сериализованная запись
+    """
+    return orjson.dumps({'data': data, 'soft_expire_at': time.time() + expire, 'delta': delta})
+
+
+def load_entry(raw: bytes) -> CacheEntry:
+    """Разбирает запись кэша.
+
+    Значения, записанные до появления мягкого срока жизни, считаются
+    свежими до истечения TTL ключа.
+
+    Args:
+        raw: Сериализованная запись
+
+    Returns:
+        CacheEntry: Запись кэша
+    """
+    obj = orjson.loads(raw)
+    if isinstance(obj, dict) and 'soft_expire_at' in obj and 'data' in obj:
+        return CacheEntry(obj['data'], obj['soft_expire_at'], obj.get('delta', 0))
+    return CacheEntry(obj, math.inf, 0)
+
+
+async def get_list_entry(redis: Redis, key: str) -> Optional[CacheEntry]:
+    """Читает из Redis запись со списком объектов.
+
+    Списки хранятся одним блобом, который пишется вместе с TTL одной
+    командой и разбирается за один проход.
+
+    Args:
+        redis: Клиент Redis
+        key: Ключ записи
+
+    Returns:
+        Optional[CacheEntry]: Запись кэша или None, если ее нет
+    """
+    data = await redis.get(key)
+    if not data:
+        return None
+    return load_entry(data)
@@ -0,0 +1,66 @@
+"""Построение канонических ключей кэша.
+
+Ключ строится не по url запроса, а по нормализованным параметрам запроса
+к elasticsearch, поэтому порядок параметров, заголовок host и посторонние
+параметры url не порождают отдельных записей в кэше.
+"""
+import hashlib
+import orjson
+
+from core.config import get_settings
+
+conf = get_settings()
+
+
+def normalize_query(query: str) -> str:
+    """Приводит поисковый запрос к нижнему регистру и схлопывает пробелы."""
+    return ' '.join(query.lower().split())
+
+
+def build_cache_key(namespace: str, **params) -> str:
+    """Строит ключ ограниченной длины с пространством имен и версией.
+
+    Args:
+        namespace: Пространство имен ключа
+        params: Нормализованные параметры запроса
+
+    Returns:
+        str: Ключ кэша вида namespace:vN:hash
+    """
+    digest = hashlib.blake2b(orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    return f'{namespace}:v{conf.CACHE_KEY_VERSION}:{digest}'
+
+
+def response_key(cache_key: str) -> str:
+    """Ключ готового ответа ручки по ключу данных запроса."""
+    return f'response:{cache_key}'
+
+
+def scope_films_key(from_: int, size: int, filter_: dict, sort: str) -> str:
+    """Ключ страницы отфильтрованного списка фильмов."""
+    return build_cache_key('films_scope', from_=from_, size=size, filter=filter_, sort=sort)
+
+
+def films_facets_key(filter_: dict) -> str:
+    """Ключ фасетов отфильтрованного списка фильмов."""
+    return build_cache_key('films_facets', filter=filter_)
+
+
+def search_films_key(query: str, from_: int, size: int) -> str:
+    """Ключ страницы результатов поиска фильмов."""
+    return build_cache_key('films_search', query=normalize_query(query), from_=from_, size=size)
+
+
+def search_films_hits_key(query: str) -> str:
+    """Ключ первых результатов поиска фильмов, общих для всех страниц."""
+    return build_cache_key('films_search_hits', query=normalize_query(query))
+
+
+def search_persons_key(query: str, from_: int, size: int) -> str:
+    """Ключ страницы результатов поиска персон."""
+    return build_cache_key('persons_search', query=normalize_query(query), from_=from_, size=size)
+
+
+def genres_list_key() -> str:
+    """Ключ списка всех жанров."""
+    return build_cache_key('genres_list')
@@ -1,19 +1,31 @@
-from functools import lru_cache
-from typing import Optional, List
+import time
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Dict, Optional, List, Tuple, Type
 
 from aioredis import Redis
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import Depends
+from pydantic import BaseModel, parse_obj_as
 
 from core.config import get_settings
 from db.elastic import get_elastic
 from db.redis import get_redis
-from models.common import FilterSimpleValues, FilterNestedValues
-from models.main import Film, Person, PersonFilm
+from models.main import Film, FilmFacets, FilmSuggestion, GenreFacet, RatingBucket, ShortFilm
+from services.cache import LRUCache, SingleFlight, dump_entry, get_cache_stats, get_list_entry, load_entry
+from services.cache_keys import films_facets_key, normalize_query, scope_films_key, search_films_hits_key
+from services.pagination import parse_sort, search_page
+from services.query_builder import build_filter_query
+from services.suggest import Suggester
+from services.utils import get_documents
 
 conf = get_settings()
 
 
+def source_fields(model: Type[BaseModel]) -> List[str]:
+    """Возвращает поля документа elasticsearch, нужные для построения модели."""
+    return [field.alias for field in model.__fields__.values()]
+
+
 class FilmService:
     """Сервис для работы с фильмами."""
 
@@ -23,99 +35,247 @@ class FilmService:
         self.elastic = elastic
 
         self.es_index = 'movies'
-        self.person_roles = ['writers', 'actors', 'directors']
+
+        self.memory_cache = LRUCache(
+            f'{self.es_index}_memory', conf.MEMORY_CACHE_MAX_SIZE, conf.MEMORY_CACHE_EXPIRE_IN_SECONDS,
+        )
+        self.redis_stats = get_cache_stats(f'{self.es_index}_redis')
+        self.single_flight = SingleFlight()
+        self.suggester = Suggester(redis, elastic, self.es_index, 'title', FilmSuggestion)
 
     async def get_by_id(self, film_id: str) -> Optional[Film]:
         """Функция для получения фильма по id."""
+        film = self.memory_cache.get(film_id)
+        if film:
+            return film
+
         film = await self._film_from_cache(film_id)
         if not film:
-            film = await self._get_film_from_elastic(film_id)
+            film = await self.single_flight.do(film_id, self._load_film, film_id)
             if not film:
                 return None
-            await self._put_film_to_cache(film)
+        self.memory_cache.set(film_id, film)
+        return film
+
+    async def get_many(self, film_ids: List[str]) -> List[Optional[Film]]:
+        """Возвращает фильмы по списку идентификаторов в порядке запроса.
+
+        Недостающие во внутрипроцессном кэше фильмы читаются из Redis одним MGET,
+        промахи Redis - одним mget из elasticsearch, найденные фильмы
+        записываются обратно в Redis одним конвейером команд.
+        """
+        films: Dict[str, Film] = {}
+        missed_ids = []
+        for film_id in dict.fromkeys(film_ids):
+            film = self.memory_cache.get(film_id)
+            if film:
+                films[film_id] = film
+            else:
+                missed_ids.append(film_id)
+
+        if missed_ids:
+            cached_films = await self._films_by_ids_from_cache(missed_ids)
+            films.update(cached_films)
+            missed_ids = [film_id for film_id in missed_ids if film_id not in cached_films]
+
+        if missed_ids:
+            started_at = time.monotonic()
+            loaded_films = await self._get_films_by_ids_from_elastic(missed_ids)
+            if loaded_films:
+                await self._put_films_by_ids_to_cache(loaded_films, time.monotonic() - started_at)
+            films.update({film.id: film for film in loaded_films})
+
+        for film in films.values():
+            self.memory_cache.set(film.id, film)
+        return [films.get(film_id) for film_id in film_ids]
+
+    async def invalidate_films(self, film_ids: List[str]):
+        """Сбрасывает закэшированные данные фильмов."""
+        # Сначала Redis: иначе конкурентный запрос успеет вернуть старое значение из него в память
+        if film_ids:
+            await self.redis.delete(*film_ids)
+        for film_id in film_ids:
+            self.memory_cache.delete(film_id)
+
+    async def _load_film(self, film_id: str) -> Optional[Film]:
+        """Загружает фильм из elasticsearch и кладет его в кэш."""
+        started_at = time.monotonic()
+        film = await self._get_film_from_elastic(film_id)
+        if film:
+            await self._put_film_to_cache(film, time.monotonic() - started_at)
         return film
 
     async def get_scope_films(
-            self, from_: int, size: int, filter: dict, sort: str, url: str,
-    ) -> Optional[List[Film]]:
+            self, from_: int, size: int, filter: dict, sort: str,
+    ) -> Optional[List[ShortFilm]]:
         """Функция для получения списка фильмов."""
-        films = await self._films_from_cache(url)
-        if not films:
-            films = await self._get_scope_films_from_elastic(
-                from_=from_, size=size, sort=sort, filter_=filter,
-            )
-            if not films:
-                return None
-            await self._put_films_to_cache(films, url)
-        return films
-
-    async def search_film(
-            self, query: str, from_: int, size: int, url: str,
-    ) -> Optional[List[Film]]:
-        """Функция для поиска фильма."""
-        films = await self._films_from_cache(url)
+        cache_key = scope_films_key(from_, size, filter, sort)
+        load = partial(self._load_scope_films, from_, size, filter, sort, cache_key)
+        films = await self._films_from_cache(cache_key, refresh=load, model=ShortFilm)
         if not films:
-            films = await self._search_film_from_elastic(
-                query=query, from_=from_, size=size,
-            )
-            if not films:
-                return None
-            await self._put_films_to_cache(films, url)
+            films = await self.single_flight.do(cache_key, load)
         return films
 
-    async def get_films_by_person(self, person_id: str) -> List[Optional[Film]]:
-        """Возвращает фильмы, в которых участвовала персона."""
-        films = await self._films_from_cache(f'film_by_person_{person_id}')
+    async def _load_scope_films(
+            self, from_: int, size: int, filter_: dict, sort: str, cache_key: str,
+    ) -> Optional[List[ShortFilm]]:
+        """Загружает список фильмов из elasticsearch и кладет его в кэш."""
+        started_at = time.monotonic()
+        films = await self._get_scope_films_from_elastic(
+            from_=from_, size=size, sort=sort, filter_=filter_,
+        )
         if not films:
-            films = []
-            try:
-                docs = await self._get_by_person_ids_from_elastic([person_id])
-                for doc in docs['hits']['hits']:
-                    source = doc['_source']
-                    films.append(Film(**source))
-                await self._put_films_to_cache(films, f'film_by_person_{person_id}')
-            except NotFoundError:
-                pass
+            return None
+        await self._put_films_to_cache(films, cache_key, time.monotonic() - started_at)
         return films
 
-    async def get_person_by_id(self, person_id: str) -> Optional[Person]:
-        """Возвращает персону по идентификатору."""
-        person = await self._person_from_cache(f'info_{person_id}')
-        if not person:
-            person = await self._get_person_from_elastic(person_id)
-            if not person:
-                return None
-            await self._put_person_to_cache(person)
-        return person
-
-    async def get_person_by_ids(self, person_ids: List[str]) -> List[Person]:
-        """Возвращает набор персон по списку идентификаторов."""
-        persons = await self._persons_from_cache('-'.join(person_ids))
-        if not persons:
-            persons = []
-            try:
-                docs = await self._get_by_person_ids_from_elastic(person_ids)
-                for person_id in person_ids:
-                    person = await self._prepare_person(person_id, docs)
-                    persons.append(person)
-                await self._put_persons_to_cache(persons, '-'.join(person_ids))
-            except NotFoundError:
-                pass
-        return persons
-
-    async def _get_person_from_elastic(self, person_id: str) -> Optional[Optional[Person]]:
-        """Возвращает персону из эластика."""
-        person = None
+    async def get_facets(self, filter: dict) -> FilmFacets:
+        """Возвращает число фильмов по жанрам и гистограмму рейтинга для фильтра."""
+        cache_key = films_facets_key(filter)
+        load = partial(self._load_facets, filter, cache_key)
+        facets = await self._facets_from_cache(cache_key, refresh=load)
+        if not facets:
+            facets = await self.single_flight.do(cache_key, load)
+        return facets
+
+    async def _load_facets(self, filter_: dict, cache_key: str) -> FilmFacets:
+        """Загружает фасеты из elasticsearch и кладет их в кэш."""
+        started_at = time.monotonic()
+        facets = await self._get_facets_from_elastic(filter_)
+        await self._put_facets_to_cache(facets, cache_key, time.monotonic() - started_at)
+        return facets
+
+    async def _get_facets_from_elastic(self, filter_: dict) -> FilmFacets:
+        """Функция для получения агрегаций по фильмам, удовлетворяющим фильтру."""
         try:
-            docs = await self._get_by_person_ids_from_elastic([person_id])
-            person = await self._prepare_person(person_id, docs)
+            doc = await self.elastic.search(
+                index=self.es_index,
+                body={
+                    'size': 0,
+                    **self._scope_films_query(filter_),
+                    'aggs': {
+                        'genres': {
+                            'nested': {'path': 'genres'},
+                            'aggs': {
+                                'ids': {
+                                    'terms': {'field': 'genres.id', 'size': conf.FACETS_GENRES_SIZE},
+                                    'aggs': {'genre': {'top_hits': {'size': 1}}},
+                                },
+                            },
+                        },
+                        'imdb_rating': {
+                            'histogram': {'field': 'imdb_rating', 'interval': conf.FACETS_RATING_INTERVAL},
+                        },
+                    },
+                },
+            )
         except NotFoundError:
-            pass
-        return person
+            return FilmFacets()
+
+        aggregations = doc['aggregations']
+        return FilmFacets(
+            genres=[
+                GenreFacet(
+                    id=bucket['key'],
+                    name=bucket['genre']['hits']['hits'][0]['_source']['name'],
+                    count=bucket['doc_count'],
+                ) for bucket in aggregations['genres']['ids']['buckets']
+            ],
+            imdb_rating=[
+                RatingBucket(rating_from=bucket['key'], count=bucket['doc_count'])
+                for bucket in aggregations['imdb_rating']['buckets']
+            ],
+        )
+
+    async def _facets_from_cache(
+            self, cache_key: str, refresh: Optional[Callable[[], Awaitable]] = None,
+    ) -> Optional[FilmFacets]:
+        """Функция отдаёт фасеты списка фильмов если они есть в кэше."""
+        data = await self.redis.get(cache_key)
+        if not data:
+            self.redis_stats.miss()
+            return None
+        self.redis_stats.hit()
+        entry = load_entry(data)
+        if refresh and entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(cache_key, refresh)
+        return FilmFacets.parse_obj(entry.data)
+
+    async def _put_facets_to_cache(self, facets: FilmFacets, cache_key: str, delta: float = 0):
+        """Функция кладёт фасеты списка фильмов в кэш."""
+        await self.redis.set(
+            cache_key,
+            dump_entry(facets.dict(), conf.LIST_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.LIST_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
+        )
+
+    async def get_scope_films_page(
+            self, size: int, filter: dict, sort: str, cursor: str,
+    ) -> Tuple[List[ShortFilm], Optional[str]]:
+        """Возвращает страницу списка фильмов по курсору и курсор следующей страницы."""
+        hits, next_cursor = await search_page(
+            self.elastic,
+            self.es_index,
+            body={'_source': source_fields(ShortFilm), **self._scope_films_query(filter)},
+            sort=[parse_sort(sort)],
+            size=size,
+            cursor=cursor,
+        )
+        return [ShortFilm(**hit['_source']) for hit in hits], next_cursor
+
+    async def search_film_page(
+            self, query: str, size: int, cursor: str,
+    ) -> Tuple[List[ShortFilm], Optional[str]]:
+        """Возвращает страницу поиска фильмов по курсору и курсор следующей страницы."""
+        hits, next_cursor = await search_page(
+            self.elastic,
+            self.es_index,
+            body={'_source': source_fields(ShortFilm), **self._search_films_query(normalize_query(query))},
+            sort=[{'_score': 'desc'}],
+            size=size,
+            cursor=cursor,
+        )
+        return [ShortFilm(**hit['_source']) for hit in hits], next_cursor
+
+    async def suggest(self, query: str, size: int) -> List[FilmSuggestion]:
+        """Возвращает подсказки по началу названия фильма."""
+        return await self.suggester.suggest(query, size)
+
+    async def search_film(
+            self, query: str, from_: int, size: int,
+    ) -> Optional[List[ShortFilm]]:
+        """Функция для поиска фильма.
+
+        Первые SEARCH_HITS_WINDOW результатов кэшируются одним списком по тексту
+        запроса, и страницы в его пределах нарезаются из этого списка.
+        """
+        query = normalize_query(query)
+        if from_ + size > conf.SEARCH_HITS_WINDOW:
+            return await self._search_film_from_elastic(query=query, from_=from_, size=size)
+
+        cache_key = search_films_hits_key(query)
+        load = partial(self._load_search_films, query, cache_key)
+        films = await self._films_from_cache(cache_key, refresh=load, model=ShortFilm)
+        if not films:
+            films = await self.single_flight.do(cache_key, load)
+        if not films:
+            return None
+        return films[from_:from_ + size] or None
+
+    async def _load_search_films(self, query: str, cache_key: str) -> Optional[List[ShortFilm]]:
+        """Ищет первые результаты поиска фильмов в elasticsearch и кладет их в кэш."""
+        started_at = time.monotonic()
+        films = await self._search_film_from_elastic(
+            query=query, from_=0, size=conf.SEARCH_HITS_WINDOW,
+        )
+        if not films:
+            return None
+        await self._put_films_to_cache(films, cache_key, time.monotonic() - started_at)
+        return films
 
     async def _search_film_from_elastic(
             self, query: str, from_: int, size: int,
-    ) -> Optional[List[Film]]:
+    ) -> Optional[List[ShortFilm]]:
         """Функция для поиска фильма в elasticsearch."""
         try:
             doc = await self.elastic.search(
@@ -123,72 +283,65 @@ class FilmService:
                 from_=from_,
                 size=size,
                 body={
-                    'query': {
-                        'multi_match': {
-                            'query': f'{query}',
-                            'fuzziness': 'auto',
-                        },
-                    },
+                    '_source': source_fields(ShortFilm),
+                    **self._search_films_query(query),
                 },
             )
         except NotFoundError:
             return None
-        return [Film(**hit['_source']) for hit in doc['hits']['hits']]
+        return [ShortFilm(**hit['_source']) for hit in doc['hits']['hits']]
+
+    def _search_films_query(self, query: str) -> dict:
+        """Возвращает поисковый запрос фильмов по профилю поиска из настроек."""
+        return {
+            'track_total_hits': conf.SEARCH_TRACK_TOTAL_HITS,
+            'query': {
+                'bool': {
+                    'should': [
+                        {
+                            'multi_match': {
+                                'query': f'{query}',
+                                'fields': conf.FILM_SEARCH_FUZZY_FIELDS,
+                                'fuzziness': conf.SEARCH_FUZZINESS,
+                                'prefix_length': conf.SEARCH_PREFIX_LENGTH,
+                                'max_expansions': conf.SEARCH_MAX_EXPANSIONS,
+                            },
+                        },
+                        {
+                            'multi_match': {
+                                'query': f'{query}',
+                                'fields': conf.FILM_SEARCH_EXACT_FIELDS,
+                            },
+                        },
+                    ],
+                    'minimum_should_match': 1,
+                },
+            },
+        }
+
+    def _scope_films_query(self, filter_: dict) -> dict:
+        """Возвращает запрос фильмов, удовлетворяющих фильтру."""
+        return build_filter_query(filter_)
 
     async def _get_scope_films_from_elastic(
             self, from_: int, size: int, filter_: dict, sort: str,
-    ) -> Optional[List[Film]]:
+    ) -> Optional[List[ShortFilm]]:
         """Функция для поиска фильмов в elasticsearch в соот. фильтрам."""
         try:
-            if filter_:
-
-                filter_nested_values = FilterNestedValues.get_values()
-                filter_simple_values = FilterSimpleValues.get_values()
-                body = []
-                for key in filter_:
-                    if key in filter_nested_values:
-                        body.append(
-                            {
-                                'nested': {
-                                    'path': f'{key}',
-                                    'query': {
-                                        'bool': {
-                                            'must': [
-                                                {
-                                                    'match': {
-                                                        f'{key}.id': f'{filter_[key]}',
-                                                    },
-                                                },
-                                            ],
-                                        },
-                                    },
-                                },
-                            },
-                        )
-                    elif key in filter_simple_values:
-                        body.append({'match': {f'{key}': f'{filter_[key]}'}})
-
-                doc = await self.elastic.search(
-                    index=self.es_index,
-                    from_=from_,
-                    size=size,
-                    sort=f'{sort[1:]}:desc' if sort[0] == '-'
-                    else f'{sort}:asc',
-                    body={
-                        'query': {'bool': {'must': body}},
-                    },
-                )
-            else:
-                doc = await self.elastic.search(
-                    index=self.es_index,
-                    from_=from_,
-                    size=size,
-                    sort=f'{sort[1:]}:desc' if sort[0] == '-'
-                    else f'{sort}:asc',
-                )
+            doc = await self.elastic.search(
+                index=self.es_index,
+                from_=from_,
+                size=size,
+                sort=f'{sort[1:]}:desc' if sort[0] == '-'
+                else f'{sort}:asc',
+                body={
+                    '_source': source_fields(ShortFilm),
+                    **self._scope_films_query(filter_),
+                },
+            )
         except NotFoundError:
             return None
-        return [Film(**hit['_source']) for hit in doc['hits']['hits']]
+        return [ShortFilm(**hit['_source']) for hit in doc['hits']['hits']]
 
     async def _get_film_from_elastic(self, film_id: str) -> Optional[Film]:
         """Функция для поиска фильма в elasticsearch по id."""
@@ -198,142 +351,81 @@ class FilmService:
             return None
         return Film(**doc['_source'])
 
+    async def _get_films_by_ids_from_elastic(self, film_ids: List[str]) -> List[Film]:
+        """Функция для получения набора фильмов из elasticsearch одним запросом mget."""
+        docs = await get_documents(self.elastic, self.es_index, film_ids)
+        return [Film(**doc) for doc in docs.values()]
+
+    async def _films_by_ids_from_cache(self, film_ids: List[str]) -> Dict[str, Film]:
+        """Функция отдаёт найденные в кэше фильмы одним запросом MGET."""
+        films = {}
+        data = await self.redis.mget(*film_ids)
+        for film_id, raw in zip(film_ids, data):
+            if not raw:
+                self.redis_stats.miss()
+                continue
+            self.redis_stats.hit()
+            entry = load_entry(raw)
+            if entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+                self.single_flight.spawn(film_id, self._load_film, film_id)
+            films[film_id] = Film.parse_obj(entry.data)
+        return films
+
+    async def _put_films_by_ids_to_cache(self, films: List[Film], delta: float = 0):
+        """Функция кладёт набор фильмов по id в кэш одним конвейером команд."""
+        pipeline = self.redis.pipeline()
+        for film in films:
+            pipeline.set(
+                film.id,
+                dump_entry(film.dict(), conf.FILM_CACHE_EXPIRE_IN_SECONDS, delta),
+                expire=conf.FILM_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
+            )
+        await pipeline.execute()
+
     async def _film_from_cache(self, film_id: str) -> Optional[Film]:
         """Функция отдаёт фильм по id если он есть в кэше."""
         data = await self.redis.get(film_id)
         if not data:
+            self.redis_stats.miss()
             return None
-        film = Film.parse_raw(data)
+        self.redis_stats.hit()
+        entry = load_entry(data)
+        if entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(film_id, self._load_film, film_id)
+        film = Film.parse_obj(entry.data)
         return film
 
-    async def _put_film_to_cache(self, film: Film):
+    async def _put_film_to_cache(self, film: Film, delta: float = 0):
         """Функция кладёт фильм по id в кэш."""
         await self.redis.set(
-            film.id, film.json(), expire=conf.FILM_CACHE_EXPIRE_IN_SECONDS,
+            film.id,
+            dump_entry(film.dict(), conf.FILM_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.FILM_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
         )
 
-    async def _person_from_cache(self, person_id: str) -> Optional[Person]:
-        """Возвращает персону ид кеша редиса."""
-        data = await self.redis.get(person_id)
-        if not data:
+    async def _films_from_cache(
+            self,
+            cache_key: str,
+            refresh: Optional[Callable[[], Awaitable]] = None,
+            model: Type[ShortFilm] = Film,
+    ) -> Optional[List[ShortFilm]]:
+        """Функция отдаёт список фильмов указанной модели если они есть в кэше."""
+        entry = await get_list_entry(self.redis, cache_key)
+        if not entry:
+            self.redis_stats.miss()
             return None
-        person = Person.parse_raw(data)
-        return person
-
-    async def _prepare_person(self, person_id: str, docs: dict) -> Person:
-        """Подготавливает полные данные по персоне и возвращает их."""
-        person = None
-        persons_roles = {}
-        for doc in docs['hits']['hits']:
-            source = doc['_source']
-
-            for role in self.person_roles:
-                dirty_person_roles = list(filter(lambda x: x['id'] == person_id, source[role]))
-                person_roles = list({v['id']: v for v in dirty_person_roles}.values())
-                if not person_roles:
-                    continue
-
-                person_id, person_name = person_roles[0]['id'], person_roles[0]['name']
-                if role not in persons_roles:
-                    persons_roles[role] = {
-                        'id': person_id,
-                        'full_name': person_name,
-                        'fw_ids': [source['id']],
-                    }
-                else:
-                    persons_roles[role]['fw_ids'].append(source['id'])
-
-        for role, role_data in persons_roles.items():
-            person_film = PersonFilm(role=role[:-1], film_ids=role_data['fw_ids'])
-            if not person:
-                person = Person(
-                    id=role_data['id'],
-                    full_name=role_data['full_name'],
-                    films=[person_film])
-            else:
-                person.films.append(person_film)
-
-        return person
-
-    async def _get_by_person_ids_from_elastic(self, person_ids: List[str]) -> dict:
-        """Возвращает результат запроса к elastic для поиска персон."""
-        return await self.elastic.search(
-            index=self.es_index,
-            body={
-                'query': {
-                    'bool': {
-                        'should': [
-                            {
-                                'nested': {
-                                    'path': 'writers',
-                                    'query': {
-                                        'terms': {
-                                            'writers.id': person_ids,
-                                        },
-                                    },
-                                },
-                            },
-                            {
-                                'nested': {
-                                    'path': 'actors',
-                                    'query': {
-                                        'terms': {
-                                            'actors.id': person_ids,
-                                        },
-                                    },
-                                },
-                            },
-                            {
-                                'nested': {
-                                    'path': 'directors',
-                                    'query': {
-                                        'terms': {
-                                            'directors.id': person_ids,
-                                        },
-                                    },
-                                },
-                            },
-                        ],
-                    },
-                },
-            },
-        )
-
-    async def _films_from_cache(self, url: str):
-        """Функция отдаёт список фильмов если они есть в кэше."""
-        data = await self.redis.lrange(url, 0, -1)
-        if not data:
-            return None
-        films = [Film.parse_raw(item) for item in data]
-        return reversed(films)
+        self.redis_stats.hit()
+        if refresh and entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(cache_key, refresh)
+        return parse_obj_as(List[model], entry.data)
 
-    async def _put_films_to_cache(self, films: List[Film], url: str):
+    async def _put_films_to_cache(self, films: List[ShortFilm], cache_key: str, delta: float = 0):
         """Функция кладёт список фильмов в кэш."""
-        data = [item.json() for item in films]
-        await self.redis.lpush(
-            url, *data,
-        )
-        await self.redis.expire(url, conf.FILM_CACHE_EXPIRE_IN_SECONDS)
-
-    async def _persons_from_cache(self, url: str):
-        """Функция отдаёт список персон если они есть в кэше."""
-        data = await self.redis.lrange(url, 0, -1)
-        if not data:
-            return None
-        persons = [Person.parse_raw(item) for item in data]
-        return list(reversed(persons))
-
-    async def _put_persons_to_cache(self, persons: List[Person], url: str):
-        """Функция кладёт список персон в кэш."""
-        data = [item.json() for item in persons]
-        await self.redis.lpush(
-            url, *data,
+        await self.redis.set(
+            cache_key,
+            dump_entry([item.dict() for item in films], conf.LIST_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.LIST_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
         )
-        await self.redis.expire(url, conf.PERSON_CACHE_EXPIRE_IN_SECONDS)
-
-    async def _put_person_to_cache(self, person: Person):
-        """Получает персону из кеша редиса."""
-        await self.redis.set(f'info_{person.id}', person.json(), expire=conf.PERSON_CACHE_EXPIRE_IN_SECONDS)
 
 
 @lru_cache()
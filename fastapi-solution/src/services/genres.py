@@ -1,14 +1,19 @@
-from functools import lru_cache
-from typing import Optional, List
+import time
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Optional, List
 
 from aioredis import Redis
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import Depends
+from pydantic import parse_obj_as
 
 from core.config import get_settings
 from db.elastic import get_elastic
 from db.redis import get_redis
 from models.main import Genre
+from services.cache import LRUCache, SingleFlight, dump_entry, get_cache_stats, get_list_entry, load_entry
+from services.cache_keys import genres_list_key, response_key
+from services.utils import get_document
 
 conf = get_settings()
 
@@ -23,95 +28,119 @@ class GenreService:
 
         self.es_index = 'genres'
 
-    async def get_genres_list(self, url: str) -> List[Genre]:
+        self.memory_cache = LRUCache(
+            f'{self.es_index}_memory', conf.MEMORY_CACHE_MAX_SIZE, conf.MEMORY_CACHE_EXPIRE_IN_SECONDS,
+        )
+        self.redis_stats = get_cache_stats(f'{self.es_index}_redis')
+        self.single_flight = SingleFlight()
+
+    async def get_genres_list(self) -> List[Genre]:
         """Возвращает список всех жанров."""
-        genres = await self._genres_from_cache(url)
+        cache_key = genres_list_key()
+        load = partial(self._load_genres_list, cache_key)
+        genres = await self._genres_from_cache(cache_key, refresh=load)
         if not genres:
-            genres = []
-            try:
-                docs = await self.elastic.search(
-                    index=self.es_index,
-                    body={
-                        'size': 10000,
-                        'query': {
-                            'match_all': {},
-                        },
-                    },
-                )
-                genre_docs = docs['hits']['hits']
-                for genre_doc in genre_docs:
-                    genres.append(Genre(**genre_doc['_source']))
-                await self._put_genres_to_cache(genres, url)
-            except NotFoundError:
-                pass
+            genres = await self.single_flight.do(cache_key, load)
 
         return genres
 
-    async def get_by_id(self, genre_id: str) -> Optional[Genre]:
-        """Возвращает жанр по идентификатору."""
-        genre = await self._genre_from_cache(genre_id)
-        if not genre:
-            genre = await self._get_genre_from_elastic(genre_id)
-            if not genre:
-                return None
-            await self._put_genre_to_cache(genre)
-
-        return genre
-
-    async def _get_genre_from_elastic(self, genre_id: str) -> Optional[Genre]:
-        """Получает жанр из elastic."""
-        genre = None
+    async def _load_genres_list(self, cache_key: str) -> List[Genre]:
+        """Загружает список всех жанров из elasticsearch и кладет его в кэш."""
+        genres = []
+        started_at = time.monotonic()
         try:
             docs = await self.elastic.search(
                 index=self.es_index,
                 body={
+                    'size': 10000,
                     'query': {
-                        'bool': {
-                            'must': [
-                                {
-                                    'match_phrase': {
-                                        'id': genre_id,
-                                    },
-                                },
-                            ],
-                        },
+                        'match_all': {},
                     },
                 },
             )
-            doc = docs['hits']['hits']
-            if doc:
-                genre = Genre(**doc[0]['_source'])
+            genre_docs = docs['hits']['hits']
+            for genre_doc in genre_docs:
+                genres.append(Genre(**genre_doc['_source']))
+            await self._put_genres_to_cache(genres, cache_key, time.monotonic() - started_at)
         except NotFoundError:
             pass
 
+        return genres
+
+    async def get_by_id(self, genre_id: str) -> Optional[Genre]:
+        """Возвращает жанр по идентификатору."""
+        genre = self.memory_cache.get(genre_id)
+        if genre:
+            return genre
+
+        genre = await self._genre_from_cache(genre_id)
+        if not genre:
+            genre = await self.single_flight.do(genre_id, self._load_genre, genre_id)
+            if not genre:
+                return None
+        self.memory_cache.set(genre_id, genre)
+
         return genre
 
+    async def invalidate(self, genre_ids: List[str]):
+        """Сбрасывает закэшированные данные жанров, их общий список и готовый ответ с ним."""
+        await self.redis.delete(genres_list_key(), response_key(genres_list_key()), *genre_ids)
+        for genre_id in genre_ids:
+            self.memory_cache.delete(genre_id)
+
+    async def _load_genre(self, genre_id: str) -> Optional[Genre]:
+        """Загружает жанр из elasticsearch и кладет его в кэш."""
+        started_at = time.monotonic()
+        genre = await self._get_genre_from_elastic(genre_id)
+        if genre:
+            await self._put_genre_to_cache(genre, time.monotonic() - started_at)
+        return genre
+
+    async def _get_genre_from_elastic(self, genre_id: str) -> Optional[Genre]:
+        """Получает жанр из elastic."""
+        doc = await get_document(self.elastic, self.es_index, genre_id)
+        return Genre(**doc) if doc else None
+
     async def _genre_from_cache(self, genre_id: str) -> Optional[Genre]:
         data = await self.redis.get(genre_id)
         if not data:
+            self.redis_stats.miss()
             return None
+        self.redis_stats.hit()
 
-        genre = Genre.parse_raw(data)
+        entry = load_entry(data)
+        if entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(genre_id, self._load_genre, genre_id)
+        genre = Genre.parse_obj(entry.data)
         return genre
 
-    async def _put_genre_to_cache(self, genre: Genre):
-        await self.redis.set(genre.id, genre.json(), expire=conf.GENRE_CACHE_EXPIRE_IN_SECONDS)
+    async def _put_genre_to_cache(self, genre: Genre, delta: float = 0):
+        await self.redis.set(
+            genre.id,
+            dump_entry(genre.dict(), conf.GENRE_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.GENRE_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
+        )
 
-    async def _genres_from_cache(self, url: str):
+    async def _genres_from_cache(
+            self, cache_key: str, refresh: Optional[Callable[[], Awaitable]] = None,
+    ) -> Optional[List[Genre]]:
         """Функция отдаёт список жанров если они есть в кэше."""
-        data = await self.redis.lrange(url, 0, -1)
-        if not data:
+        entry = await get_list_entry(self.redis, cache_key)
+        if not entry:
+            self.redis_stats.miss()
             return None
-        genres = [Genre.parse_raw(item) for item in data]
-        return reversed(genres)
+        self.redis_stats.hit()
+        if refresh and entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(cache_key, refresh)
+        return parse_obj_as(List[Genre], entry.data)
 
-    async def _put_genres_to_cache(self, genres: List[Genre], url: str):
+    async def _put_genres_to_cache(self, genres: List[Genre], cache_key: str, delta: float = 0):
         """Функция кладёт список жанров в кэш."""
-        data = [item.json() for item in genres]
-        await self.redis.lpush(
-            url, *data,
+        await self.redis.set(
+            cache_key,
+            dump_entry([item.dict() for item in genres], conf.LIST_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.LIST_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
         )
-        await self.redis.expire(url, conf.GENRE_CACHE_EXPIRE_IN_SECONDS)
 
 
 @lru_cache()
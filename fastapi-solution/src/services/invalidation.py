@@ -0,0 +1,71 @@
+"""Сброс кэша по оповещениям ETL об изменении документов.
+
+ETL после записи документов в elasticsearch публикует их идентификаторы
+в канал Redis. Каждый воркер API подписан на канал и сбрасывает как записи
+в Redis, так и свой внутрипроцессный кэш.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+import orjson
+from aioredis import Redis, RedisError
+from elasticsearch import AsyncElasticsearch
+
+from core.config import get_settings
+from services.films import get_film_service
+from services.genres import get_genre_service
+from services.persons import get_person_service
+
+conf = get_settings()
+logger = logging.getLogger(__name__)
+
+# Пауза перед повторной подпиской после обрыва соединения, в секундах
+RESUBSCRIBE_DELAY = 1
+
+listener: Optional[asyncio.Future] = None
+
+
+async def invalidate(message: dict, redis: Redis, elastic: AsyncElasticsearch):
+    """Сбрасывает кэш сущностей, перечисленных в сообщении ETL.
+
+    Args:
+        message: Сообщение ETL с названием индекса и идентификаторами документов
+        redis: Клиент Redis
+        elastic: Клиент elasticsearch
+    """
+    # Сервисы берутся из тех же фабрик и с теми же аргументами, что и в ручках,
+    # чтобы сбросить внутрипроцессный кэш именно их экземпляров
+    film_service = get_film_service(redis=redis, elastic=elastic)
+    person_service = get_person_service(redis=redis, elastic=elastic)
+    genre_service = get_genre_service(redis=redis, elastic=elastic)
+
+    index, ids = message['index'], message['ids']
+    if index == film_service.es_index:
+        await film_service.invalidate_films(ids)
+    elif index == person_service.es_index:
+        # Фильмография хранится в документе персоны, ETL переписывает его при изменении фильмов
+        await person_service.invalidate(ids)
+    elif index == genre_service.es_index:
+        await genre_service.invalidate(ids)
+
+
+async def listen(redis: Redis, elastic: AsyncElasticsearch):
+    """Слушает канал оповещений ETL и сбрасывает кэш по каждому сообщению.
+
+    Args:
+        redis: Клиент Redis
+        elastic: Клиент elasticsearch
+    """
+    while True:
+        try:
+            channel, = await redis.subscribe(conf.CACHE_INVALIDATION_CHANNEL)
+            async for raw_message in channel.iter():
+                try:
+                    await invalidate(orjson.loads(raw_message), redis, elastic)
+                except Exception:
+                    # Ошибка одного сообщения не должна останавливать сброс кэша до перезапуска воркера
+                    logger.exception('Failed to handle cache invalidation message %s', raw_message)
+        except (RedisError, OSError) as err:
+            logger.error('Cache invalidation subscription failed: %s', err)
+        await asyncio.sleep(RESUBSCRIBE_DELAY)
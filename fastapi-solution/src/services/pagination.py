@@ -0,0 +1,105 @@
+"""Постраничный обход выдачи elasticsearch по курсору.
+
+Курсор - это закодированные идентификатор point in time и значения сортировки
+последнего документа страницы. Следующая страница запрашивается через
+search_after в том же снимке индекса, поэтому глубокие страницы не замедляются,
+не упираются в index.max_result_window и не теряют строки при записи ETL.
+"""
+import base64
+import binascii
+from typing import List, Optional, Tuple
+
+import orjson
+from elasticsearch import AsyncElasticsearch, BadRequestError, NotFoundError
+
+from core.config import get_settings
+
+conf = get_settings()
+
+# Поле, однозначно упорядочивающее документы внутри point in time
+TIEBREAKER_SORT = {'_shard_doc': 'asc'}
+
+
+class CursorError(Exception):
+    """Курсор поврежден или его point in time уже закрыт."""
+
+
+def encode_cursor(pit_id: str, search_after: list) -> str:
+    """Кодирует состояние обхода в непрозрачную строку."""
+    data = orjson.dumps({'pit': pit_id, 'after': search_after})
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor: str, sort_size: int) -> Tuple[str, list]:
+    """Раскодирует курсор в идентификатор point in time и значения сортировки.
+
+    Args:
+        cursor: Курсор из заголовка X-Next-Cursor
+        sort_size: Число полей сортировки выдачи вместе с полем TIEBREAKER_SORT
+
+    Returns:
+        Tuple[str, list]: Идентификатор point in time и значения search_after
+    """
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        pit_id, search_after = data['pit'], data['after']
+    except (binascii.Error, ValueError, TypeError, KeyError) as err:
+        raise CursorError('Invalid cursor') from err
+    if not isinstance(pit_id, str) or not isinstance(search_after, list) or len(search_after) != sort_size:
+        raise CursorError('Invalid cursor')
+    return pit_id, search_after
+
+
+def parse_sort(sort: str) -> dict:
+    """Преобразует сортировку вида -field в сортировку elasticsearch."""
+    if sort.startswith('-'):
+        return {sort[1:]: 'desc'}
+    return {sort: 'asc'}
+
+
+async def search_page(
+        elastic: AsyncElasticsearch, index: str, body: dict, sort: List[dict], size: int, cursor: str,
+) -> Tuple[List[dict], Optional[str]]:
+    """Возвращает страницу выдачи и курсор следующей страницы.
+
+    Args:
+        elastic: Клиент elasticsearch
+        index: Индекс, по которому открывается point in time
+        body: Тело запроса без сортировки и пагинации
+        sort: Сортировка выдачи
+        size: Размер страницы
+        cursor: Курсор, пустая строка - начало выдачи
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: Документы страницы и курсор следующей страницы,
+            None - если выдача закончилась
+    """
+    sort = [*sort, TIEBREAKER_SORT]
+    if cursor:
+        pit_id, search_after = decode_cursor(cursor, len(sort))
+    else:
+        pit = await elastic.open_point_in_time(index=index, keep_alive=conf.ELASTIC_PIT_KEEP_ALIVE)
+        pit_id, search_after = pit['id'], None
+
+    body = {
+        **body,
+        'size': size,
+        'sort': sort,
+        'pit': {'id': pit_id, 'keep_alive': conf.ELASTIC_PIT_KEEP_ALIVE},
+    }
+    if search_after:
+        body['search_after'] = search_after
+    try:
+        docs = await elastic.search(body=body)
+    except NotFoundError as err:
+        raise CursorError('Cursor expired') from err
+    except BadRequestError as err:
+        # Чужой point in time или подмененные значения search_after
+        raise CursorError('Invalid cursor') from err
+
+    hits = docs['hits']['hits']
+    pit_id = docs.get('pit_id', pit_id)
+    if len(hits) < size:
+        await elastic.close_point_in_time(id=pit_id)
+        return hits, None
+    return hits, encode_cursor(pit_id, hits[-1]['sort'])
@@ -1,17 +1,27 @@
-from functools import lru_cache
-from typing import Optional, List
+import time
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Optional, List, Tuple
 
 from aioredis import Redis
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import Depends
+from pydantic import parse_obj_as
 
 from core.config import get_settings
 from db.elastic import get_elastic
 from db.redis import get_redis
-from models.main import Person
+from models.main import Person, PersonSuggestion
+from services.cache import LRUCache, SingleFlight, dump_entry, get_cache_stats, get_list_entry, load_entry
+from services.cache_keys import normalize_query, search_persons_key
+from services.pagination import search_page
+from services.suggest import Suggester
+from services.utils import get_document
 
 conf = get_settings()
 
+# Поля персоны в выдаче поиска: фильмография с названиями нужна только карточке персоны
+SEARCH_SOURCE_FIELDS = ['id', 'full_name', 'films']
+
 
 class PersonService:
     """Сервис для работы с участниками фильма."""
@@ -23,26 +33,77 @@ class PersonService:
 
         self.es_index = 'persons'
 
+        self.memory_cache = LRUCache(
+            f'{self.es_index}_memory', conf.MEMORY_CACHE_MAX_SIZE, conf.MEMORY_CACHE_EXPIRE_IN_SECONDS,
+        )
+        self.redis_stats = get_cache_stats(f'{self.es_index}_redis')
+        self.single_flight = SingleFlight()
+        self.suggester = Suggester(redis, elastic, self.es_index, 'full_name', PersonSuggestion)
+
     async def get_by_id(self, person_id: str) -> Optional[Person]:
         """Возвращает участника фильма по идентификатору."""
+        person = self.memory_cache.get(person_id)
+        if person:
+            return person
+
         person = await self._person_from_cache(person_id)
         if not person:
-            person = await self._get_person_from_elastic(person_id)
+            person = await self.single_flight.do(person_id, self._load_person, person_id)
             if not person:
                 return None
-            await self._put_person_to_cache(person)
+        self.memory_cache.set(person_id, person)
         return person
 
-    async def search_person(self, query: str, from_: int, size: int, url: str) -> Optional[List[Person]]:
+    async def invalidate(self, person_ids: List[str]):
+        """Сбрасывает закэшированные данные персон."""
+        if person_ids:
+            await self.redis.delete(*person_ids)
+        for person_id in person_ids:
+            self.memory_cache.delete(person_id)
+
+    async def _load_person(self, person_id: str) -> Optional[Person]:
+        """Загружает персону из elasticsearch и кладет ее в кэш."""
+        started_at = time.monotonic()
+        person = await self._get_person_from_elastic(person_id)
+        if person:
+            await self._put_person_to_cache(person, time.monotonic() - started_at)
+        return person
+
+    async def search_person(self, query: str, from_: int, size: int) -> Optional[List[Person]]:
         """Возвращает совпадения по персоне."""
-        persons = await self._persons_from_cache(url)
+        query = normalize_query(query)
+        cache_key = search_persons_key(query, from_, size)
+        load = partial(self._load_search_persons, query, from_, size, cache_key)
+        persons = await self._persons_from_cache(cache_key, refresh=load)
         if not persons:
-            persons = await self._search_person_from_elastic(query=query, from_=from_, size=size)
-            if not persons:
-                return None
-            await self._put_persons_to_cache(persons, url)
+            persons = await self.single_flight.do(cache_key, load)
         return persons
 
+    async def _load_search_persons(self, query: str, from_: int, size: int, cache_key: str) -> Optional[List[Person]]:
+        """Ищет персоны в elasticsearch и кладет результат в кэш."""
+        started_at = time.monotonic()
+        persons = await self._search_person_from_elastic(query=query, from_=from_, size=size)
+        if not persons:
+            return None
+        await self._put_persons_to_cache(persons, cache_key, time.monotonic() - started_at)
+        return persons
+
+    async def suggest(self, query: str, size: int) -> List[PersonSuggestion]:
+        """Возвращает подсказки по началу имени персоны."""
+        return await self.suggester.suggest(query, size)
+
+    async def search_person_page(self, query: str, size: int, cursor: str) -> Tuple[List[Person], Optional[str]]:
+        """Возвращает страницу поиска персон по курсору и курсор следующей страницы."""
+        hits, next_cursor = await search_page(
+            self.elastic,
+            self.es_index,
+            body={'_source': SEARCH_SOURCE_FIELDS, **self._search_persons_query(normalize_query(query))},
+            sort=[{'_score': 'desc'}],
+            size=size,
+            cursor=cursor,
+        )
+        return [Person(**hit['_source']) for hit in hits], next_cursor
+
     async def _search_person_from_elastic(self, query: str, from_: int, size: int) -> Optional[List[Person]]:
         """Ищет данные по персоне в индексе персон."""
         try:
@@ -50,106 +111,70 @@ class PersonService:
                 index=self.es_index,
                 from_=from_,
                 size=size,
-                body={
-                    'query': {
-                        'multi_match': {
-                            'query': f'{query}',
-                            'fuzziness': 'auto',
-                        },
-                    },
-                },
+                body={'_source': SEARCH_SOURCE_FIELDS, **self._search_persons_query(query)},
             )
         except NotFoundError:
             return None
         return [Person(**hit['_source']) for hit in doc['hits']['hits']]
 
-    async def enrich_person_data(self, main_person_info: Person, fw_person_info: Person) -> Person:
-        """Обогащает данные по персоне, возвращает полные данные по персоне."""
-        person = await self._enriched_person_from_cache(main_person_info.id)
-        if not person:
-            person = main_person_info.copy()
-            person.films = fw_person_info.films.copy()
-            await self._put_enriched_person_to_cache(person)
-        return person
-
-    async def _enriched_person_from_cache(self, person_id: str) -> Optional[Person]:
-        """Получает персону из кеша редиса."""
-        data = await self.redis.get(f'enriched_{person_id}')
-        if not data:
-            return None
-        person = Person.parse_raw(data)
-        return person
-
-    async def _put_enriched_person_to_cache(self, person: Person):
-        """Кладет персону в кеш редиса."""
-        await self.redis.set(f'enriched_{person.id}', person.json(), expire=conf.PERSON_CACHE_EXPIRE_IN_SECONDS)
+    def _search_persons_query(self, query: str) -> dict:
+        """Возвращает поисковый запрос персон."""
+        return {
+            'query': {
+                'multi_match': {
+                    'query': f'{query}',
+                    'fields': ['full_name'],
+                    'fuzziness': 'auto',
+                },
+            },
+        }
 
     async def _person_from_cache(self, person_id: str) -> Optional[Person]:
         """Кладет персону в кеш редиса."""
         data = await self.redis.get(person_id)
         if not data:
+            self.redis_stats.miss()
             return None
-        person = Person.parse_raw(data)
+        self.redis_stats.hit()
+        entry = load_entry(data)
+        if entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(person_id, self._load_person, person_id)
+        person = Person.parse_obj(entry.data)
         return person
 
-    async def _put_person_to_cache(self, person: Person):
+    async def _put_person_to_cache(self, person: Person, delta: float = 0):
         """Получает персону из кеша редиса."""
-        await self.redis.set(person.id, person.json(), expire=conf.PERSON_CACHE_EXPIRE_IN_SECONDS)
+        await self.redis.set(
+            person.id,
+            dump_entry(person.dict(), conf.PERSON_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.PERSON_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
+        )
 
     async def _get_person_from_elastic(self, person_id: str) -> Optional[Person]:
         """Возвращает персону из эластика."""
-        person = None
-        try:
-            docs = await self.elastic.search(
-                index=self.es_index,
-                body={
-                    'query': {
-                        'bool': {
-                            'must': [
-                                {
-                                    'match_phrase': {
-                                        'id': person_id,
-                                    },
-                                },
-                            ],
-                        },
-                    },
-                },
-            )
-            doc = docs['hits']['hits']
-            if doc:
-                person = Person(**doc[0]['_source'])
-        except NotFoundError:
-            pass
-
-        return person
+        doc = await get_document(self.elastic, self.es_index, person_id)
+        return Person(**doc) if doc else None
 
-    async def enrich_persons_list_data(self, persons: List[Person], fw_person_info: List[Person]) -> List[Person]:
-        """Возвращает полный список персон с расширенными данными."""
-        full_persons = []
-        for person_base, person_fw in zip(persons, fw_person_info):
-            if person_fw:
-                full_person = await self.enrich_person_data(person_base, person_fw)
-            else:
-                full_person = person_base
-            full_persons.append(full_person)
-        return full_persons
-
-    async def _persons_from_cache(self, url: str):
+    async def _persons_from_cache(
+            self, cache_key: str, refresh: Optional[Callable[[], Awaitable]] = None,
+    ) -> Optional[List[Person]]:
         """Функция отдаёт список персон если они есть в кэше."""
-        data = await self.redis.lrange(url, 0, -1)
-        if not data:
+        entry = await get_list_entry(self.redis, cache_key)
+        if not entry:
+            self.redis_stats.miss()
             return None
-        persons = [Person.parse_raw(item) for item in data]
-        return list(reversed(persons))
+        self.redis_stats.hit()
+        if refresh and entry.should_refresh(conf.CACHE_EARLY_REFRESH_BETA):
+            self.single_flight.spawn(cache_key, refresh)
+        return parse_obj_as(List[Person], entry.data)
 
-    async def _put_persons_to_cache(self, persons: List[Person], url: str):
+    async def _put_persons_to_cache(self, persons: List[Person], cache_key: str, delta: float = 0):
         """Функция кладёт список персон в кэш."""
-        data = [item.json() for item in persons]
-        await self.redis.lpush(
-            url, *data,
+        await self.redis.set(
+            cache_key,
+            dump_entry([item.dict() for item in persons], conf.LIST_CACHE_EXPIRE_IN_SECONDS, delta),
+            expire=conf.LIST_CACHE_EXPIRE_IN_SECONDS + conf.CACHE_STALE_IN_SECONDS,
         )
-        await self.redis.expire(url, conf.PERSON_CACHE_EXPIRE_IN_SECONDS)
 
 
 @lru_cache()
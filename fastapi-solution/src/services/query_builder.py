@@ -0,0 +1,141 @@
+"""Компиляция фильтра списка фильмов в запрос elasticsearch.
+
+Фильтры не влияют на релевантность, поэтому собираются в bool.filter:
+elasticsearch не считает по ним score и кэширует их на узлах. Точные
+совпадения по идентификаторам строятся через terms, несколько значений
+перечисляются через запятую, рейтинг задается диапазоном вида 7..9.
+Текстовые поля ищутся одним запросом match по значению целиком.
+"""
+import math
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from models.common import FilterNestedValues, FilterSimpleValues
+
+# Разделитель нескольких значений фильтра и границ диапазона
+VALUES_SEPARATOR = ','
+RANGE_SEPARATOR = '..'
+
+ClauseBuilder = Callable[[str], dict]
+
+# Поля полнотекстового поиска, их значение не разбивается на части
+TEXT_FILTER_VALUES = (FilterSimpleValues.title.value, FilterSimpleValues.description.value)
+
+
+def split_values(value: str) -> List[str]:
+    """Разбивает значение фильтра на уникальные значения в каноническом порядке."""
+    return sorted({item.strip() for item in value.split(VALUES_SEPARATOR) if item.strip()})
+
+
+def parse_number(value: str) -> float:
+    """Разбирает конечное число значения фильтра.
+
+    Raises:
+        ValueError: Значение не является конечным числом
+    """
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f'Not a finite number: {value}')
+    return number
+
+
+def parse_range(value: str) -> Tuple[Optional[float], Optional[float]]:
+    """Разбирает диапазон вида 7..9, 7.. или ..9.
+
+    Raises:
+        ValueError: Границы диапазона не являются конечными числами или обе не заданы
+    """
+    lower, _, upper = value.partition(RANGE_SEPARATOR)
+    if not lower and not upper:
+        raise ValueError(f'Empty range: {value}')
+    return (parse_number(lower) if lower else None), (parse_number(upper) if upper else None)
+
+
+def normalize_filter_value(key: str, value: str) -> str:
+    """Приводит значение фильтра к каноническому виду для ключа кэша.
+
+    Raises:
+        ValueError: Значение не может быть разобрано
+    """
+    if key in TEXT_FILTER_VALUES:
+        return value.strip()
+    values = split_values(value)
+    if key == FilterSimpleValues.imdb_rating.value:
+        for item in values:
+            parse_range(item)
+    return VALUES_SEPARATOR.join(values)
+
+
+def _nested_clause(key: str) -> ClauseBuilder:
+    def build(value: str) -> dict:
+        return {'nested': {'path': key, 'query': {'terms': {f'{key}.id': split_values(value)}}}}
+    return build
+
+
+def _terms_clause(field: str) -> ClauseBuilder:
+    def build(value: str) -> dict:
+        return {'terms': {field: split_values(value)}}
+    return build
+
+
+def _match_clause(field: str) -> ClauseBuilder:
+    def build(value: str) -> dict:
+        return {'match': {field: value}}
+    return build
+
+
+def _rating_clause(field: str) -> ClauseBuilder:
+    def build(value: str) -> dict:
+        should = []
+        for item in split_values(value):
+            if RANGE_SEPARATOR not in item:
+                should.append({'term': {field: parse_number(item)}})
+                continue
+            lower, upper = parse_range(item)
+            bounds = {}
+            if lower is not None:
+                bounds['gte'] = lower
+            if upper is not None:
+                bounds['lte'] = upper
+            should.append({'range': {field: bounds}})
+        return {'bool': {'should': should, 'minimum_should_match': 1}}
+    return build
+
+
+def _clause_builder(key: str) -> Optional[ClauseBuilder]:
+    """Возвращает построитель условия для поля фильтра."""
+    if key in FilterNestedValues.get_values():
+        return _nested_clause(key)
+    if key == FilterSimpleValues.id.value:
+        return _terms_clause(key)
+    if key == FilterSimpleValues.imdb_rating.value:
+        return _rating_clause(key)
+    if key in TEXT_FILTER_VALUES:
+        return _match_clause(key)
+    return None
+
+
+@lru_cache()
+def compile_skeleton(keys: FrozenSet[str]) -> Tuple[Tuple[str, ClauseBuilder], ...]:
+    """Возвращает скомпилированный шаблон запроса для набора полей фильтра."""
+    skeleton = []
+    for key in sorted(keys):
+        builder = _clause_builder(key)
+        if builder:
+            skeleton.append((key, builder))
+    return tuple(skeleton)
+
+
+def build_filter_query(filter_: Dict[str, str]) -> dict:
+    """Строит запрос фильмов, удовлетворяющих фильтру.
+
+    Args:
+        filter_: Проверенный фильтр запроса, см. api.v1.utils.get_filter
+
+    Returns:
+        dict: Часть тела запроса с ключом query, пустая - если фильтра нет
+    """
+    if not filter_:
+        return {}
+    clauses = [build(filter_[key]) for key, build in compile_skeleton(frozenset(filter_))]
+    return {'query': {'bool': {'filter': clauses}}}
@@ -0,0 +1,66 @@
+import hashlib
+from functools import lru_cache
+from http import HTTPStatus
+from typing import Any, Optional
+
+import orjson
+from aioredis import Redis
+from fastapi import Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from core.config import get_settings
+from db.redis import get_redis
+from services.cache import get_cache_stats
+from services.cache_keys import response_key
+
+conf = get_settings()
+
+
+class ResponseCache:
+    """Кэш готовых сериализованных ответов ручек.
+
+    В Redis под каноническим ключом запроса хранится ETag и тело ответа,
+    поэтому попадание - это один GET без построения моделей и сериализации.
+    """
+
+    def __init__(self, redis: Redis):
+        """Инициализация кэша."""
+        self.redis = redis
+        self.stats = get_cache_stats('response_redis')
+
+    async def get(self, request: Request, cache_key: str) -> Optional[Response]:
+        """Возвращает закэшированный ответ на запрос, если он есть."""
+        if not conf.RESPONSE_CACHE_ENABLED:
+            return None
+        data = await self.redis.get(response_key(cache_key))
+        if not data:
+            self.stats.miss()
+            return None
+        self.stats.hit()
+        etag, body = data.split(b'\n', 1)
+        return self._build_response(request, etag.decode(), body)
+
+    async def put(self, request: Request, cache_key: str, content: Any) -> Response:
+        """Сериализует содержимое ответа, кладет его в кэш и возвращает ответ."""
+        body = orjson.dumps(jsonable_encoder(content))
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if conf.RESPONSE_CACHE_ENABLED:
+            await self.redis.set(
+                response_key(cache_key),
+                etag.encode() + b'\n' + body,
+                expire=conf.RESPONSE_CACHE_EXPIRE_IN_SECONDS,
+            )
+        return self._build_response(request, etag, body)
+
+    def _build_response(self, request: Request, etag: str, body: bytes) -> Response:
+        """Строит ответ, учитывая условный заголовок If-None-Match."""
+        headers = {'ETag': f'"{etag}"'}
+        if request.headers.get('if-none-match') == headers['ETag']:
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+
+@lru_cache()
+def get_response_cache(redis: Redis = Depends(get_redis)) -> ResponseCache:
+    """Возвращает экземпляр кэша ответов."""
+    return ResponseCache(redis)
@@ -0,0 +1,107 @@
+"""Подсказки при наборе поискового запроса.
+
+Запрос идет по подполю search_as_you_type с префиксным сопоставлением
+без нечеткого поиска и возвращает только идентификатор и название.
+Время ответа ограничено: при превышении бюджета подсказки просто не
+показываются. Результаты недолго живут во внутрипроцессном кэше и в Redis,
+так как соседние нажатия клавиш разных пользователей повторяют префиксы.
+"""
+import logging
+from typing import List, Optional, Type
+
+import orjson
+from aioredis import Redis
+from elasticsearch import AsyncElasticsearch, ConnectionTimeout, NotFoundError
+from pydantic import parse_raw_as
+
+from core.config import get_settings
+from models.common import UUIDMixin
+from services.cache import LRUCache, get_cache_stats
+from services.cache_keys import build_cache_key, normalize_query
+
+conf = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class Suggester:
+    """Подсказки по полю индекса."""
+
+    def __init__(
+            self, redis: Redis, elastic: AsyncElasticsearch, es_index: str, field: str, model: Type[UUIDMixin],
+    ):
+        """Инициализация подсказок.
+
+        Args:
+            redis: Клиент Redis
+            elastic: Клиент elasticsearch
+            es_index: Название индекса
+            field: Поле индекса с подполем suggest типа search_as_you_type
+            model: Модель подсказки из идентификатора и поля field
+        """
+        self.redis = redis
+        self.elastic = elastic
+        self.es_index = es_index
+        self.field = field
+        self.model = model
+
+        self.memory_cache = LRUCache(
+            f'{es_index}_suggest_memory', conf.MEMORY_CACHE_MAX_SIZE, conf.SUGGEST_CACHE_EXPIRE_IN_SECONDS,
+        )
+        self.redis_stats = get_cache_stats(f'{es_index}_suggest_redis')
+
+    async def suggest(self, query: str, size: int) -> List[UUIDMixin]:
+        """Возвращает подсказки для начала поискового запроса."""
+        query = normalize_query(query)
+        cache_key = build_cache_key(f'{self.es_index}_suggest', query=query, size=size)
+        suggestions = self.memory_cache.get(cache_key)
+        if suggestions is not None:
+            return suggestions
+
+        data = await self.redis.get(cache_key)
+        if data:
+            self.redis_stats.hit()
+            suggestions = parse_raw_as(List[self.model], data)
+        else:
+            self.redis_stats.miss()
+            suggestions = await self._suggest_from_elastic(query, size)
+            if suggestions is None:
+                return []
+            await self.redis.set(
+                cache_key,
+                orjson.dumps([item.dict() for item in suggestions]),
+                expire=conf.SUGGEST_CACHE_EXPIRE_IN_SECONDS,
+            )
+        self.memory_cache.set(cache_key, suggestions)
+        return suggestions
+
+    async def _suggest_from_elastic(self, query: str, size: int) -> Optional[List[UUIDMixin]]:
+        """Ищет подсказки в elasticsearch, None - если бюджет времени исчерпан."""
+        suggest_field = f'{self.field}.suggest'
+        try:
+            docs = await self.elastic.options(
+                request_timeout=conf.SUGGEST_TIMEOUT_IN_SECONDS,
+                max_retries=0,
+                retry_on_timeout=False,
+            ).search(
+                index=self.es_index,
+                body={
+                    'size': size,
+                    'timeout': f'{int(conf.SUGGEST_TIMEOUT_IN_SECONDS * 1000)}ms',
+                    '_source': ['id', self.field],
+                    'query': {
+                        'multi_match': {
+                            'query': query,
+                            'type': 'bool_prefix',
+                            'fields': [suggest_field, f'{suggest_field}._2gram', f'{suggest_field}._3gram'],
+                        },
+                    },
+                },
+            )
+        except NotFoundError:
+            return []
+        except ConnectionTimeout:
+            logger.warning('Suggest in %s exceeded %ss', self.es_index, conf.SUGGEST_TIMEOUT_IN_SECONDS)
+            return None
+        if docs.get('timed_out'):
+            return None
+        return [self.model(**hit['_source']) for hit in docs['hits']['hits']]
@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional
+
+from elasticsearch import AsyncElasticsearch, BadRequestError, NotFoundError
+
+from core.config import get_settings
+
+conf = get_settings()
+
+
+async def get_document(elastic: AsyncElasticsearch, index: str, doc_id: str) -> Optional[dict]:
+    """Возвращает документ индекса по идентификатору.
+
+    ETL записывает документы с _id, равным полю id, поэтому документ читается
+    через get без участия поиска. Старые документы с другим _id ищутся по полю id,
+    если включена настройка ELASTIC_ID_LOOKUP_FALLBACK, а также если get по индексу
+    невозможен, например индекс - псевдоним на несколько индексов.
+
+    Args:
+        elastic: Клиент elasticsearch
+        index: Название индекса
+        doc_id: Идентификатор документа
+
+    Returns:
+        Optional[dict]: Исходный документ, None - если он не найден
+    """
+    try:
+        doc = await elastic.get(index=index, id=doc_id)
+        return doc['_source']
+    except NotFoundError:
+        if not conf.ELASTIC_ID_LOOKUP_FALLBACK:
+            return None
+    except BadRequestError:
+        pass
+    return (await _search_documents(elastic, index, [doc_id])).get(doc_id)
+
+
+async def get_documents(elastic: AsyncElasticsearch, index: str, doc_ids: List[str]) -> Dict[str, dict]:
+    """Возвращает документы индекса по списку идентификаторов одним запросом mget.
+
+    Документы, которые mget не смог прочитать из-за ошибки индекса, а при
+    включенной настройке ELASTIC_ID_LOOKUP_FALLBACK и не найденные по _id,
+    дочитываются одним поиском по полю id.
+
+    Args:
+        elastic: Клиент elasticsearch
+        index: Название индекса
+        doc_ids: Идентификаторы документов
+
+    Returns:
+        Dict[str, dict]: Найденные исходные документы по идентификаторам
+    """
+    try:
+        docs = await elastic.mget(index=index, body={'ids': doc_ids})
+    except NotFoundError:
+        return {}
+    except BadRequestError:
+        return await _search_documents(elastic, index, doc_ids)
+    found = {doc['_id']: doc['_source'] for doc in docs['docs'] if doc.get('found')}
+    missed_ids = [
+        doc['_id'] for doc in docs['docs']
+        if 'error' in doc or (conf.ELASTIC_ID_LOOKUP_FALLBACK and not doc.get('found'))
+    ]
+    if missed_ids:
+        found.update(await _search_documents(elastic, index, missed_ids))
+    return found
+
+
+async def _search_documents(elastic: AsyncElasticsearch, index: str, doc_ids: List[str]) -> Dict[str, dict]:
+    """Ищет документы по полю id."""
+    try:
+        docs = await elastic.search(
+            index=index,
+            body={
+                'size': len(doc_ids),
+                'query': {'terms': {'id': doc_ids}},
+            },
+        )
+    except NotFoundError:
+        return {}
+    return {hit['_source']['id']: hit['_source'] for hit in docs['hits']['hits']}
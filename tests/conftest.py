@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Сервис API и ETL запускаются из своих каталогов, тесты импортируют их модули так же
+for source_dir in ('fastapi-solution/src', 'etl'):
+    sys.path.insert(0, os.path.join(ROOT_DIR, source_dir))
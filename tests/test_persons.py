@@ -0,0 +1,29 @@
+"""Тесты фильмографии персон."""
+from common.models.utils_sql import FilmographyResult
+from models.main import Person
+from persons.transform import Transform
+
+
+def test_person_with_unrated_film():
+    """Персона с фильмом без рейтинга собирается из документа индекса."""
+    person = Person(**{
+        'id': 'person',
+        'full_name': 'Person',
+        'films': [{'role': 'actor', 'film_ids': ['film']}],
+        'film_works': [{'id': 'film', 'title': 'Film', 'imdb_rating': None}],
+    })
+
+    assert person.film_works[0].imdb_rating is None
+
+
+def test_transform_keeps_unrated_film():
+    """ETL записывает фильм без рейтинга в фильмографию персоны."""
+    transform = Transform()
+    person = type('Person', (), {'id': 'person', 'full_name': 'Person'})
+    filmography = [FilmographyResult('person', 'actor', 'film', 'Film', None)]
+
+    transform.create_documents([person], [filmography])
+
+    document = transform.base_dict['person']
+    assert document['film_works'] == [{'id': 'film', 'title': 'Film', 'imdb_rating': None}]
+    assert Person(**document).film_works[0].imdb_rating is None